@@ -0,0 +1,205 @@
+# matchup/_kernels.py
+
+"""
+Compiled inner loops for the matchup engine.
+
+Numba is optional. When it is importable the kernels below are compiled
+with @njit; otherwise NUMBA_AVAILABLE is False, the decorator is a no-op,
+and callers are expected to use their NumPy implementation instead (the
+kernels still run as plain Python, which is only useful for testing).
+
+fastmath is enabled without the no-NaN / no-Inf assumptions: L2 swaths
+routinely contain non-finite pixels and those must compare False.
+"""
+
+from __future__ import annotations
+
+import math
+
+import numpy as np
+
+try:
+    import numba
+    from numba import njit, prange
+
+    NUMBA_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on the environment
+    NUMBA_AVAILABLE = False
+    prange = range
+
+    def njit(*args, **kwargs):
+        def decorate(fn):
+            return fn
+
+        return decorate
+
+
+_FASTMATH = {"nsz", "arcp", "contract", "afn"}
+
+
+def set_num_threads(n: int) -> None:
+    """
+    Limit the threads the parallel kernels use in this process (numba's
+    default is all CPUs). No-op without Numba.
+    """
+    if NUMBA_AVAILABLE:
+        numba.set_num_threads(max(1, min(int(n), numba.config.NUMBA_NUM_THREADS)))
+
+
+@njit(parallel=True, fastmath=_FASTMATH, cache=True)
+def haversine_km_flat(lat1_deg, lon1_deg, lat2_deg, lon2_deg, radius_km, out):
+    """
+    Great-circle distance (km) from one point to each point of the flat
+    arrays lat2_deg/lon2_deg, written into out. Degrees in, km out.
+    """
+    lat1 = math.radians(lat1_deg)
+    lon1 = math.radians(lon1_deg)
+    cos_lat1 = math.cos(lat1)
+
+    for i in prange(lat2_deg.shape[0]):
+        lat2 = math.radians(lat2_deg[i])
+        sin_dlat = math.sin((lat2 - lat1) / 2.0)
+        sin_dlon = math.sin((math.radians(lon2_deg[i]) - lon1) / 2.0)
+        a = sin_dlat * sin_dlat + cos_lat1 * math.cos(lat2) * sin_dlon * sin_dlon
+        out[i] = radius_km * 2.0 * math.atan2(math.sqrt(a), math.sqrt(abs(1.0 - a)))
+
+
+@njit(parallel=True, fastmath=_FASTMATH, cache=True)
+def haversine_km_prepared(lat1_rad, lon1_rad, cos_lat1, lat2_rad, lon2_rad, cos_lat2,
+                          radius_km, out):
+    """
+    Same as haversine_km_flat, but on inputs already converted to radians
+    with cos(lat) precomputed for both sides (flat arrays for the grid).
+    """
+    for i in prange(lat2_rad.shape[0]):
+        sin_dlat = math.sin((lat2_rad[i] - lat1_rad) / 2.0)
+        sin_dlon = math.sin((lon2_rad[i] - lon1_rad) / 2.0)
+        a = sin_dlat * sin_dlat + cos_lat1 * cos_lat2[i] * sin_dlon * sin_dlon
+        out[i] = radius_km * 2.0 * math.atan2(math.sqrt(a), math.sqrt(abs(1.0 - a)))
+
+
+@njit(parallel=True, fastmath=_FASTMATH, cache=True)
+def haversine_km_segments(rec_lat_rad, rec_lon_rad, rec_cos_lat, seg, idx,
+                          lat2_rad, lon2_rad, cos_lat2, radius_km, out):
+    """
+    haversine_km_prepared for many records at once: out[i] is the
+    distance from record seg[i] to grid pixel idx[i] (flat grid arrays),
+    so the candidate pixels of all records are checked in one pass.
+    """
+    for i in prange(idx.shape[0]):
+        k = seg[i]
+        j = idx[i]
+        sin_dlat = math.sin((lat2_rad[j] - rec_lat_rad[k]) / 2.0)
+        sin_dlon = math.sin((lon2_rad[j] - rec_lon_rad[k]) / 2.0)
+        a = sin_dlat * sin_dlat + rec_cos_lat[k] * cos_lat2[j] * sin_dlon * sin_dlon
+        out[i] = radius_km * 2.0 * math.atan2(math.sqrt(a), math.sqrt(abs(1.0 - a)))
+
+
+@njit(fastmath=_FASTMATH, cache=True)
+def _within_km(lat1_rad, lon1_rad, cos_lat1, lat2_rad, lon2_rad, cos_lat2,
+               radius_km, max_distance_km, max_dlat_rad):
+    # |dlat| is a lower bound on the central angle: skip the trig for
+    # pixels that are clearly too far north/south.
+    dlat = lat2_rad - lat1_rad
+    if not abs(dlat) <= max_dlat_rad:
+        return False
+    sin_dlat = math.sin(dlat / 2.0)
+    sin_dlon = math.sin((lon2_rad - lon1_rad) / 2.0)
+    a = sin_dlat * sin_dlat + cos_lat1 * cos_lat2 * sin_dlon * sin_dlon
+    d = radius_km * 2.0 * math.atan2(math.sqrt(a), math.sqrt(abs(1.0 - a)))
+    return d <= max_distance_km
+
+
+@njit(parallel=True, fastmath=_FASTMATH, cache=True)
+def window_pixel_counts(rec_lat_rad, rec_lon_rad, rec_cos_lat, lat2_rad, lon2_rad, cos_lat2,
+                        radius_km, max_distance_km, max_dlat_rad, counts):
+    """
+    For each record, the number of grid pixels (flat arrays) within
+    max_distance_km. Records are processed in parallel.
+    """
+    for k in prange(rec_lat_rad.shape[0]):
+        n = 0
+        for i in range(lat2_rad.shape[0]):
+            if _within_km(rec_lat_rad[k], rec_lon_rad[k], rec_cos_lat[k],
+                          lat2_rad[i], lon2_rad[i], cos_lat2[i],
+                          radius_km, max_distance_km, max_dlat_rad):
+                n += 1
+        counts[k] = n
+
+
+@njit(parallel=True, fastmath=_FASTMATH, cache=True)
+def window_pixel_indices(rec_lat_rad, rec_lon_rad, rec_cos_lat, lat2_rad, lon2_rad, cos_lat2,
+                         radius_km, max_distance_km, max_dlat_rad, offsets, out):
+    """
+    Second pass of window_pixel_counts: write the flat indices of the
+    pixels within max_distance_km of record k, in ascending order, into
+    out[offsets[k]:offsets[k + 1]].
+    """
+    for k in prange(rec_lat_rad.shape[0]):
+        j = offsets[k]
+        for i in range(lat2_rad.shape[0]):
+            if _within_km(rec_lat_rad[k], rec_lon_rad[k], rec_cos_lat[k],
+                          lat2_rad[i], lon2_rad[i], cos_lat2[i],
+                          radius_km, max_distance_km, max_dlat_rad):
+                out[j] = i
+                j += 1
+
+
+@njit(cache=True)
+def clear_bad_flag_pixels(flags, idx, bad_flag_mask, keep):
+    """
+    keep[i] = False where flags[idx[i]] has any bit of bad_flag_mask set
+    (flags: flat uint32 array), in one pass without temporaries.
+    """
+    for i in range(idx.shape[0]):
+        if flags[idx[i]] & bad_flag_mask:
+            keep[i] = False
+
+
+@njit(parallel=True, cache=True)
+def segment_stats(values, starts, sizes, counts, mean, median, std):
+    """
+    Per (variable, segment) count / mean / median / population std of
+    the finite values, for values of shape (n_vars, n_pixels) split into
+    segments values[:, starts[s]:starts[s] + sizes[s]]. Outputs are
+    (n_vars, n_segments); NaN where a segment has no finite value.
+
+    One pass gathers the finite values and their sum, a second one sums
+    the squared deviations, and the median comes from a partial sort
+    (np.partition) of the gathered values.
+    """
+    n_segments = starts.shape[0]
+    for j in prange(values.shape[0] * n_segments):
+        v = j // n_segments
+        s = j % n_segments
+        buf = np.empty(sizes[s])
+        n = 0
+        total = 0.0
+        for i in range(starts[s], starts[s] + sizes[s]):
+            x = values[v, i]
+            if math.isfinite(x):
+                buf[n] = x
+                total += x
+                n += 1
+
+        counts[v, s] = n
+        if n == 0:
+            mean[v, s] = math.nan
+            median[v, s] = math.nan
+            std[v, s] = math.nan
+            continue
+
+        m = total / n
+        ss = 0.0
+        for i in range(n):
+            d = buf[i] - m
+            ss += d * d
+        mean[v, s] = m
+        std[v, s] = math.sqrt(ss / n)
+
+        part = np.partition(buf[:n], n // 2)
+        if n % 2 == 1:
+            median[v, s] = part[n // 2]
+        else:
+            # The lower middle value is the largest one left of the pivot
+            median[v, s] = (part[:n // 2].max() + part[n // 2]) / 2.0
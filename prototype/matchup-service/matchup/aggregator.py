@@ -7,6 +7,10 @@ from typing import Dict, Any
 import numpy as np
 
 
+# Result for "no finite values"; handed out as a copy.
+_EMPTY_STATS: Dict[str, Any] = {"mean": None, "median": None, "std": None, "count": 0}
+
+
 def aggregate_values(values) -> Dict[str, Any]:
     """
     Compute basic statistics over a 1D array-like of pixel values.
@@ -21,19 +25,38 @@ def aggregate_values(values) -> Dict[str, Any]:
 
     If there are no finite values, mean/median/std are None and count is 0.
     """
+    if isinstance(values, (list, tuple)) and not values:
+        # Common for windows at the swath edge; no NumPy round trip needed
+        return dict(_EMPTY_STATS)
+
     arr = np.asarray(values, dtype=float).ravel()
     if arr.size == 0:
-        return {"mean": None, "median": None, "std": None, "count": 0}
+        return dict(_EMPTY_STATS)
 
     valid = np.isfinite(arr)
     if not valid.any():
-        return {"mean": None, "median": None, "std": None, "count": 0}
+        return dict(_EMPTY_STATS)
 
-    v = arr[valid]
+    v = arr[valid]  # private copy, safe to reorder below
     count = int(v.size)
-    mean = float(np.mean(v))
-    median = float(np.median(v))
-    std = float(np.std(v, ddof=1)) if count > 1 else 0.0
+
+    mean = v.sum() / count
+    if count > 1:
+        # Deviations from the mean (not sum of squares) to avoid cancellation
+        d = v - mean
+        std = float(np.sqrt(np.dot(d, d) / (count - 1)))
+    else:
+        std = 0.0
+
+    # O(n) selection in place; np.median would copy v first
+    k = count // 2
+    if count % 2:
+        v.partition(k)
+        median = float(v[k])
+    else:
+        v.partition((k - 1, k))
+        median = float((v[k - 1] + v[k]) / 2.0)
+    mean = float(mean)
 
     return {
         "mean": mean,
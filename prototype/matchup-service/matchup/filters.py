@@ -10,14 +10,21 @@ Responsibilities (Subtask 3):
   - Convenience helpers to get valid masks / indices
 
 This module is intentionally stateless and operates on L2Grid
-objects (from l2_loader.py) and simple scalar parameters.
+objects (from l2_loader.py) and simple scalar parameters. The only
+exceptions are the pixel KD-tree and the good-flag masks, which are
+built lazily on first use and cached on the L2Grid so every SeaBASS
+record can reuse them.
 """
 
 from __future__ import annotations
 
+import math
+
 import numpy as np
+from scipy.spatial import cKDTree
 from typing import Optional, Tuple
 
+from ._kernels import NUMBA_AVAILABLE, haversine_km_flat, haversine_km_prepared
 from .l2_loader import L2Grid
 from .seabass_parser import SeaBASSRecord
 
@@ -37,24 +44,219 @@ def haversine_distance_km(
     (lat1_deg, lon1_deg) and arrays of points (lat2_deg, lon2_deg).
 
     All inputs are in degrees. Output is same shape as lat2_deg/lon2_deg.
+
+    Uses the Numba kernel when available (single pass, no full-grid
+    temporaries), otherwise the NumPy implementation.
+    """
+    if NUMBA_AVAILABLE and np.ndim(lat1_deg) == 0 and np.ndim(lon1_deg) == 0:
+        lat2 = np.ascontiguousarray(lat2_deg)
+        lon2 = np.ascontiguousarray(lon2_deg)
+        if lat2.shape == lon2.shape:
+            out = np.empty(lat2.shape, dtype=_float_dtype(lat2))
+            haversine_km_flat(
+                float(lat1_deg),
+                float(lon1_deg),
+                lat2.reshape(-1),
+                lon2.reshape(-1),
+                float(radius_km),
+                out.reshape(-1),
+            )
+            return out
+
+    return _haversine_distance_km_numpy(lat1_deg, lon1_deg, lat2_deg, lon2_deg, radius_km)
+
+
+def _haversine_distance_km_numpy(
+    lat1_deg: float,
+    lon1_deg: float,
+    lat2_deg: np.ndarray,
+    lon2_deg: np.ndarray,
+    radius_km: float = 6371.0,
+) -> np.ndarray:
+    """
+    NumPy implementation of haversine_distance_km.
     """
-    lat1 = np.deg2rad(lat1_deg)
-    lon1 = np.deg2rad(lon1_deg)
     lat2 = np.deg2rad(lat2_deg)
-    lon2 = np.deg2rad(lon2_deg)
+    return _haversine_prepared_numpy(
+        *_prepared_point(lat1_deg, lon1_deg, lat2.dtype),
+        lat2, np.deg2rad(lon2_deg), np.cos(lat2),
+        radius_km,
+    )
+
+
+def _float_dtype(arr: np.ndarray) -> np.dtype:
+    """
+    Floating dtype that arithmetic on arr should stay in: float32 grids
+    stay float32, everything else is float64.
+    """
+    return np.result_type(arr.dtype, np.float32)
+
+
+def _prepared_point(lat_deg, lon_deg, dtype=np.float64):
+    """
+    (lat_rad, lon_rad, cos_lat) for the centre point(s), cast to the
+    grid's float dtype so float32 grids are not promoted to float64.
+    """
+    if np.ndim(lat_deg) == 0 and np.ndim(lon_deg) == 0:
+        # Single point: math is much cheaper than NumPy on scalars
+        lat = math.radians(lat_deg)
+        to_dtype = np.dtype(dtype).type
+        return to_dtype(lat), to_dtype(math.radians(lon_deg)), to_dtype(math.cos(lat))
+
+    lat = np.deg2rad(lat_deg)
+    return (
+        np.asarray(lat, dtype=dtype),
+        np.asarray(np.deg2rad(lon_deg), dtype=dtype),
+        np.asarray(np.cos(lat), dtype=dtype),
+    )
+
+
+def _haversine_from_prepared(
+    lat1_rad: float,
+    lon1_rad: float,
+    cos_lat1: float,
+    lat2_rad: np.ndarray,
+    lon2_rad: np.ndarray,
+    cos_lat2: np.ndarray,
+    radius_km: float = 6371.0,
+) -> np.ndarray:
+    """
+    Haversine core on pre-converted inputs: radians plus cos(lat) for
+    both sides, so the grid-side terms can be computed once per granule
+    (L2Grid.lat_rad / lon_rad / cos_lat) instead of once per record.
+    """
+    if NUMBA_AVAILABLE and np.ndim(lat1_rad) == 0 and np.ndim(lon1_rad) == 0:
+        lat2 = np.ascontiguousarray(lat2_rad)
+        lon2 = np.ascontiguousarray(lon2_rad)
+        cos2 = np.ascontiguousarray(cos_lat2)
+        if lat2.shape == lon2.shape == cos2.shape:
+            out = np.empty(lat2.shape, dtype=_float_dtype(lat2))
+            haversine_km_prepared(
+                float(lat1_rad),
+                float(lon1_rad),
+                float(cos_lat1),
+                lat2.reshape(-1),
+                lon2.reshape(-1),
+                cos2.reshape(-1),
+                float(radius_km),
+                out.reshape(-1),
+            )
+            return out
+
+    return _haversine_prepared_numpy(
+        lat1_rad, lon1_rad, cos_lat1, lat2_rad, lon2_rad, cos_lat2, radius_km
+    )
 
-    dlat = lat2 - lat1
-    dlon = lon2 - lon1
 
-    sin_dlat = np.sin(dlat / 2.0)
-    sin_dlon = np.sin(dlon / 2.0)
+def _haversine_prepared_numpy(
+    lat1_rad,
+    lon1_rad,
+    cos_lat1,
+    lat2_rad,
+    lon2_rad,
+    cos_lat2,
+    radius_km: float = 6371.0,
+) -> np.ndarray:
+    """
+    NumPy haversine core; inputs broadcast against each other. The
+    result dtype follows the inputs (float32 in, float32 out).
+    """
+    sin_dlat = np.sin((lat2_rad - lat1_rad) / 2.0)
+    sin_dlon = np.sin((lon2_rad - lon1_rad) / 2.0)
 
-    a = sin_dlat**2 + np.cos(lat1) * np.cos(lat2) * sin_dlon**2
-    c = 2.0 * np.arcsin(np.minimum(1.0, np.sqrt(a)))
+    a = np.square(sin_dlat)
+    a += cos_lat1 * cos_lat2 * np.square(sin_dlon)
+    # atan2 form needs no clamp; abs() absorbs rounding of a just above 1
+    c = 2.0 * np.arctan2(np.sqrt(a), np.sqrt(np.abs(1.0 - a)))
 
     return radius_km * c
 
 
+def _ecef_point(lat_deg: float, lon_deg: float) -> np.ndarray:
+    """
+    Unit-sphere Cartesian (x, y, z) vector for a single lat/lon point.
+    """
+    lat = math.radians(lat_deg)
+    lon = math.radians(lon_deg)
+    cos_lat = math.cos(lat)
+    return np.array([cos_lat * math.cos(lon), cos_lat * math.sin(lon), math.sin(lat)])
+
+
+def _ecef_points(lat_deg: np.ndarray, lon_deg: np.ndarray) -> np.ndarray:
+    """
+    Unit-sphere Cartesian (x, y, z) rows, shape (N, 3), for arrays of
+    lat/lon points: the vectorized form of _ecef_point.
+    """
+    lat = np.deg2rad(np.asarray(lat_deg, dtype=np.float64))
+    lon = np.deg2rad(np.asarray(lon_deg, dtype=np.float64))
+    cos_lat = np.cos(lat)
+    return np.column_stack((cos_lat * np.cos(lon), cos_lat * np.sin(lon), np.sin(lat)))
+
+
+def _ecef_unit(l2: L2Grid) -> np.ndarray:
+    """
+    Unit-sphere Cartesian coordinates of every L2 pixel as an (N, 3)
+    array in the coordinate dtype (row-major over lat/lon), built from
+    the trig terms cached on the L2Grid. Computed once per granule and
+    cached on the L2Grid.
+    """
+    if l2._ecef is None:
+        lon = l2.lon_rad.ravel()
+        cos_lat = l2.cos_lat.ravel()
+        l2._ecef = np.column_stack(
+            (cos_lat * np.cos(lon), cos_lat * np.sin(lon), l2.sin_lat.ravel())
+        )
+    return l2._ecef
+
+
+# Threads used by batched KD-tree queries (-1: all CPUs). The queries
+# release the GIL and share the one tree, so no data is copied per worker.
+_TREE_QUERY_WORKERS = -1
+
+
+def set_tree_query_workers(n: int) -> None:
+    """
+    Set the threads used by batched KD-tree queries (-1: all CPUs), e.g.
+    1 inside a worker process that shares the CPUs with other workers.
+    """
+    global _TREE_QUERY_WORKERS
+    _TREE_QUERY_WORKERS = int(n)
+
+
+def _tree_query_workers() -> int:
+    return _TREE_QUERY_WORKERS
+
+
+def _pixel_tree(l2: L2Grid) -> Tuple[cKDTree, np.ndarray]:
+    """
+    KD-tree over the unit-sphere coordinates of all finite L2 pixels.
+
+    Returns:
+        (tree, flat_index) where flat_index maps tree point i back to
+        the flat (row-major) pixel index in l2.lat.
+    """
+    if l2._tree is None:
+        xyz = _ecef_unit(l2)
+        flat_index = np.flatnonzero(np.isfinite(xyz).all(axis=1))
+        l2._ecef_index = flat_index
+        l2._tree = cKDTree(xyz[flat_index])
+    return l2._tree, l2._ecef_index
+
+
+def _chord_radius(max_distance_km: float, radius_km: float = 6371.0) -> float:
+    """
+    Convert a great-circle distance to the equivalent straight-line
+    (chord) distance on the unit sphere. Chord length is monotonic in
+    great-circle distance, so KD-tree neighbourhoods match haversine ones.
+
+    A small pad (~6 m, well above the float32 rounding of the pixel
+    coordinates the tree is built from) keeps boundary pixels as
+    candidates; callers re-check the exact haversine distance.
+    """
+    half_angle = min(max_distance_km / (2.0 * radius_km), np.pi / 2.0)
+    return 2.0 * np.sin(half_angle) * (1.0 + 1e-9) + 1e-6
+
+
 # --- individual masks ------------------------------------------------------
 
 
@@ -71,16 +273,82 @@ def build_spatial_mask(
     If max_distance_km is None or <= 0, returns an all-True mask.
     """
     shape = l2.lat.shape
-    mask = np.ones(shape, dtype=bool)
 
     if max_distance_km is None or max_distance_km <= 0:
-        return mask
+        return np.ones(shape, dtype=bool)
 
-    distances = haversine_distance_km(center_lat, center_lon, l2.lat, l2.lon)
-    mask &= distances <= max_distance_km
+    # Cheap lat/lon box first; haversine only for pixels inside it
+    mask = _bbox_mask(l2, center_lat, center_lon, max_distance_km)
+    _refine_by_distance(l2, mask, center_lat, center_lon, max_distance_km)
     return mask
 
 
+def _bbox_mask(
+    l2: L2Grid,
+    center_lat: float,
+    center_lon: float,
+    max_distance_km: float,
+    radius_km: float = 6371.0,
+    out: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Conservative lat/lon bounding box around the centre point: every
+    pixel within max_distance_km is inside it, so it can be used to
+    skip the haversine for most of the swath.
+
+    From the haversine formula, |dlat| <= c and
+    sin(|dlon|/2) <= sin(c/2) / sqrt(cos(lat1) * cos(lat2)) for central
+    angle c. The longitude limit is dropped when the box reaches a pole
+    or crosses the antimeridian.
+
+    If out is given the box is ANDed into it in place and out is
+    returned. The box is tested as lo <= x <= hi, which compares the
+    grid directly instead of building |x - c| float temporaries.
+    """
+    # Pad covers float32 rounding of lat/lon (~1e-6 deg)
+    pad_deg = 1e-4
+    c = max_distance_km / radius_km
+    # Python floats keep the comparisons in the grid's dtype
+    dlat_max = float(np.rad2deg(c)) + pad_deg
+
+    if out is None:
+        out = np.ones(l2.lat.shape, dtype=bool)
+    out &= l2.lat >= center_lat - dlat_max
+    out &= l2.lat <= center_lat + dlat_max
+
+    lat_edge = np.deg2rad(min(abs(center_lat) + dlat_max, 90.0))
+    denom = np.cos(np.deg2rad(center_lat)) * np.cos(lat_edge)
+    if denom <= 0:
+        return out
+    s = np.sin(min(c, np.pi) / 2.0) / np.sqrt(denom)
+    if s >= 1.0:
+        return out
+    dlon_max = float(np.rad2deg(2.0 * np.arcsin(s))) + pad_deg
+    if center_lon - dlon_max < -180.0 or center_lon + dlon_max > 180.0:
+        return out
+
+    out &= l2.lon >= center_lon - dlon_max
+    out &= l2.lon <= center_lon + dlon_max
+    return out
+
+
+def _refine_by_distance(
+    l2: L2Grid,
+    mask: np.ndarray,
+    center_lat: float,
+    center_lon: float,
+    max_distance_km: float,
+) -> None:
+    """
+    In place: keep only mask pixels within max_distance_km, evaluating
+    the haversine for currently-True pixels only.
+    """
+    flat_mask = mask.reshape(-1)
+    flat = np.flatnonzero(flat_mask)
+    # NaN distances (non-finite pixels) compare False
+    flat_mask[flat] = _distances_at(l2, flat, center_lat, center_lon) <= max_distance_km
+
+
 def build_time_mask(
     l2: L2Grid,
     center_time,
@@ -100,50 +368,48 @@ def build_time_mask(
     This is a prototype: we keep things simple and robust rather than
     handling every possible exotic time layout.
     """
-    shape = l2.lat.shape
-    mask = np.ones(shape, dtype=bool)
+    mask = np.ones(l2.lat.shape, dtype=bool)
+
+    time_ok = _time_ok(l2, center_time, max_time_diff_sec)
+    if time_ok is not None:
+        mask &= time_ok
+    return mask
 
+
+def _time_ok(
+    l2: L2Grid,
+    center_time,
+    max_time_diff_sec: Optional[float],
+) -> Optional[np.ndarray]:
+    """
+    Time predicate behind build_time_mask.
+
+    Returns a boolean array broadcastable to l2.lat.shape (full shape
+    for per-pixel time, (nlines, 1) for per-line time), or None when
+    no time filtering applies.
+    """
     if l2.time is None or center_time is None:
-        return mask
+        return None
 
     if max_time_diff_sec is None or max_time_diff_sec <= 0:
-        return mask
+        return None
 
-    time_arr = np.array(l2.time)
+    # l2.time is float64 epoch seconds (converted once by L2Grid).
+    # We assume 'center_time' is a Python datetime; convert to seconds
+    center_sec = center_time.timestamp()
 
     # Case 1: same shape as lat/lon
-    if time_arr.shape == shape:
-        # We assume 'center_time' is a Python datetime; convert to seconds
-        center_sec = center_time.timestamp()
-        # Convert to seconds; if already numeric, this is a no-op assuming units are seconds
-        # For prototype, assume numeric time is already seconds since some epoch.
-        try:
-            arr_sec = time_arr.astype(np.float64)
-        except Exception:
-            # If not numeric, bail out to all-True
-            return mask
-
-        diffs = np.abs(arr_sec - center_sec)
-        mask &= diffs <= max_time_diff_sec
-        return mask
+    if l2.time.shape == l2.lat.shape:
+        return np.abs(l2.time - center_sec) <= max_time_diff_sec
 
     # Case 2: 1D time, 2D lat/lon (e.g., per-line time)
-    if time_arr.ndim == 1 and l2.lat.ndim == 2:
-        nlines = time_arr.shape[0]
-        if l2.lat.shape[0] == nlines:
-            center_sec = center_time.timestamp()
-            try:
-                arr_sec = time_arr.astype(np.float64)
-            except Exception:
-                return mask
-            diffs_1d = np.abs(arr_sec - center_sec)
-            # Broadcast along columns
-            diffs_2d = np.repeat(diffs_1d[:, np.newaxis], l2.lat.shape[1], axis=1)
-            mask &= diffs_2d <= max_time_diff_sec
-            return mask
+    if l2.time_is_per_line:
+        good_line = np.abs(l2.time - center_sec) <= max_time_diff_sec
+        # Broadcast the per-line result along columns
+        return good_line[:, np.newaxis]
 
     # Any other shape mismatch: we skip time filtering for now
-    return mask
+    return None
 
 
 def build_flag_mask(
@@ -163,20 +429,33 @@ def build_flag_mask(
     Returns:
         Boolean array of same shape as lat/lon indicating "good" pixels.
     """
-    shape = l2.lat.shape
-    mask = np.ones(shape, dtype=bool)
+    good = _good_flag_mask(l2, bad_flag_mask)
+    if good is None:
+        return np.ones(l2.lat.shape, dtype=bool)
+    return good.copy()
 
-    if l2.flags is None or not bad_flag_mask:
-        return mask
 
-    flags_arr = np.array(l2.flags)
-    if flags_arr.shape != shape:
+def _good_flag_mask(l2: L2Grid, bad_flag_mask: Optional[int]) -> Optional[np.ndarray]:
+    """
+    Read-only good-pixel mask for bad_flag_mask, or None when no flag
+    filtering applies. It depends only on the granule, so it is computed
+    once per (L2Grid, bad_flag_mask) and cached on the grid.
+    """
+    if l2.flags is None or not bad_flag_mask:
+        return None
+    if np.shape(l2.flags) != l2.lat.shape:
         # Shape mismatch; for prototype, don't try to be clever
-        return mask
+        return None
 
-    bad = (flags_arr & np.uint32(bad_flag_mask)) != 0
-    mask &= ~bad
-    return mask
+    key = int(bad_flag_mask)
+    cached = l2._good_flags.get(key)
+    if cached is not None and cached[0] is l2.flags:
+        return cached[1]
+
+    good = (np.asarray(l2.flags) & np.uint32(bad_flag_mask)) == 0
+    good.flags.writeable = False
+    l2._good_flags[key] = (l2.flags, good)
+    return good
 
 
 # --- combined helpers ------------------------------------------------------
@@ -203,19 +482,46 @@ def build_valid_pixel_mask(
     Returns:
         Boolean numpy array, same shape as l2.lat/lon.
     """
-    spatial = build_spatial_mask(
-        l2, seabass_rec.lat, seabass_rec.lon, max_distance_km
+    return _valid_mask_fused(
+        l2,
+        seabass_rec.lat,
+        seabass_rec.lon,
+        seabass_rec.time,
+        max_distance_km,
+        max_time_diff_sec,
+        bad_flag_mask,
     )
 
-    temporal = build_time_mask(
-        l2, seabass_rec.time, max_time_diff_sec
-    )
 
-    flags = build_flag_mask(
-        l2, bad_flag_mask
-    )
+def _valid_mask_fused(
+    l2: L2Grid,
+    center_lat: float,
+    center_lon: float,
+    center_time,
+    max_distance_km: Optional[float],
+    max_time_diff_sec: Optional[float],
+    bad_flag_mask: Optional[int],
+) -> np.ndarray:
+    """
+    Equivalent to build_spatial_mask & build_time_mask & build_flag_mask,
+    built into a single output array.
+
+    Predicates are applied cheapest first (flags, then time) and the
+    haversine is only evaluated for pixels that are still valid, so no
+    per-predicate full-size masks or full-swath distance array are made.
+    The separate builders above are kept for debugging.
+    """
+    mask = build_flag_mask(l2, bad_flag_mask)
+
+    time_ok = _time_ok(l2, center_time, max_time_diff_sec)
+    if time_ok is not None:
+        mask &= time_ok
+
+    if max_distance_km is None or max_distance_km <= 0:
+        return mask
 
-    mask = spatial & temporal & flags
+    _bbox_mask(l2, center_lat, center_lon, max_distance_km, out=mask)
+    _refine_by_distance(l2, mask, center_lat, center_lon, max_distance_km)
     return mask
 
 
@@ -229,6 +535,75 @@ def get_valid_pixel_indices(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     return np.where(mask)
 
 
+def _time_mask_at(
+    l2: L2Grid,
+    flat: np.ndarray,
+    center_time,
+    max_time_diff_sec: Optional[float],
+) -> np.ndarray:
+    """
+    Same test as build_time_mask, evaluated only at the given pixels
+    (flat, row-major indices).
+    """
+    mask = np.ones(flat.shape, dtype=bool)
+
+    if l2.time is None or center_time is None:
+        return mask
+
+    if max_time_diff_sec is None or max_time_diff_sec <= 0:
+        return mask
+
+    if l2.time.shape == l2.lat.shape:
+        arr_sec = l2.time.ravel()[flat]
+    elif l2.time_is_per_line:
+        arr_sec = l2.time[flat // l2.lat.shape[1]]
+    else:
+        return mask
+
+    mask &= np.abs(arr_sec - center_time.timestamp()) <= max_time_diff_sec
+    return mask
+
+
+def _flag_mask_at(
+    l2: L2Grid,
+    flat: np.ndarray,
+    bad_flag_mask: Optional[int],
+) -> np.ndarray:
+    """
+    Same test as build_flag_mask, evaluated only at the given pixels
+    (flat, row-major indices).
+    """
+    mask = np.ones(flat.shape, dtype=bool)
+
+    if l2.flags is None or not bad_flag_mask:
+        return mask
+
+    flags_arr = np.asarray(l2.flags)
+    if flags_arr.shape != l2.lat.shape:
+        return mask
+
+    mask &= (flags_arr.ravel()[flat] & np.uint32(bad_flag_mask)) == 0
+    return mask
+
+
+def _distances_at(
+    l2: L2Grid,
+    flat: np.ndarray,
+    center_lat: float,
+    center_lon: float,
+) -> np.ndarray:
+    """
+    Haversine distance (km) from the centre point to the given pixels
+    (flat, row-major indices), using the grid's cached radians / cos(lat).
+    """
+    return _haversine_from_prepared(
+        *_prepared_point(center_lat, center_lon, l2.lat_rad.dtype),
+        l2.lat_rad.ravel()[flat],
+        l2.lon_rad.ravel()[flat],
+        l2.cos_lat.ravel()[flat],
+    )
+
+
 def find_nearest_valid_pixel(
     l2: L2Grid,
     seabass_rec: SeaBASSRecord,
@@ -241,35 +616,45 @@ def find_nearest_valid_pixel(
     all filters (distance, time, flags). Returns None if no valid
     pixel remains.
 
-    Note:
-        This is a prototype implementation and is not optimized for
-        performance on very large swaths. It computes distances only
-        for pixels that pass the basic mask.
-    """
-    mask = build_valid_pixel_mask(
-        l2=l2,
-        seabass_rec=seabass_rec,
-        max_distance_km=max_distance_km,
-        max_time_diff_sec=max_time_diff_sec,
-        bad_flag_mask=bad_flag_mask,
-    )
-
-    if not mask.any():
-        return None
-
-    # Indices of valid pixels
-    rows, cols = np.where(mask)
-
-    # Compute distances only for these
-    lats = l2.lat[rows, cols]
-    lons = l2.lon[rows, cols]
-
-    dists = haversine_distance_km(
-        seabass_rec.lat,
-        seabass_rec.lon,
-        lats,
-        lons,
-    )
-
-    idx_min = int(np.argmin(dists))
-    return int(rows[idx_min]), int(cols[idx_min])
+    With a distance limit, candidates come from a ball query on the
+    granule's cached pixel KD-tree, so only pixels near the record are
+    touched; the time and flag filters are then checked on those
+    candidates only. Without a distance limit every pixel is a
+    candidate and the full-grid mask is used instead.
+    """
+    if max_distance_km is None or max_distance_km <= 0:
+        mask = build_valid_pixel_mask(
+            l2=l2,
+            seabass_rec=seabass_rec,
+            max_distance_km=max_distance_km,
+            max_time_diff_sec=max_time_diff_sec,
+            bad_flag_mask=bad_flag_mask,
+        )
+
+        if not mask.any():
+            return None
+
+        flat = np.flatnonzero(mask)
+        dists = _distances_at(l2, flat, seabass_rec.lat, seabass_rec.lon)
+    else:
+        tree, flat_index = _pixel_tree(l2)
+        candidates = tree.query_ball_point(
+            _ecef_point(seabass_rec.lat, seabass_rec.lon),
+            r=_chord_radius(max_distance_km),
+        )
+        if not candidates:
+            return None
+
+        # Sorted row-major order keeps tie-breaking identical to np.where
+        flat = np.sort(flat_index[np.asarray(candidates, dtype=np.intp)])
+        dists = _distances_at(l2, flat, seabass_rec.lat, seabass_rec.lon)
+
+        keep = dists <= max_distance_km
+        keep &= _time_mask_at(l2, flat, seabass_rec.time, max_time_diff_sec)
+        keep &= _flag_mask_at(l2, flat, bad_flag_mask)
+        if not keep.any():
+            return None
+        flat, dists = flat[keep], dists[keep]
+
+    row, col = np.unravel_index(flat[int(np.argmin(dists))], l2.lat.shape)
+    return int(row), int(col)
@@ -1,13 +1,15 @@
 # matchup/l2_loader.py
 
-from dataclasses import dataclass
-from typing import Dict, Iterable, Optional, Sequence
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Dict, Iterable, Optional, Sequence
 
+import os
 import re
 from datetime import datetime, timezone
 
 import numpy as np
-from netCDF4 import Dataset
+from netCDF4 import Dataset, default_fillvals
 
 
 @dataclass
@@ -19,6 +21,59 @@ class L2Grid:
     time: Optional[np.ndarray]
     # Fallback time when per-pixel/per-scanline time is not available:
     granule_datetime_utc: Optional[datetime] = None
+    # Lazily-built spatial index over the pixel grid (see filters._pixel_tree):
+    _ecef: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+    _ecef_index: Optional[np.ndarray] = field(default=None, init=False, repr=False, compare=False)
+    _tree: Optional[Any] = field(default=None, init=False, repr=False, compare=False)
+    # Good-pixel masks per bad_flag_mask (see filters._good_flag_mask):
+    _good_flags: Dict[int, Any] = field(
+        default_factory=dict, init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        # Time is only ever used as float64 epoch seconds; convert once here
+        # rather than per SeaBASS record. Non-numeric time disables time use.
+        if self.time is not None:
+            try:
+                self.time = np.ascontiguousarray(self.time, dtype=np.float64)
+            except (TypeError, ValueError):
+                self.time = None
+
+    @cached_property
+    def time_is_per_line(self) -> bool:
+        """
+        True when time is one value per scan line of a 2D lat/lon grid.
+        """
+        return (
+            self.time is not None
+            and self.time.ndim == 1
+            and self.lat.ndim == 2
+            and self.time.shape[0] == self.lat.shape[0]
+        )
+
+    # Per-granule trig terms for distance computations. Computed on first
+    # use and reused for every SeaBASS record matched against this grid.
+    # They keep the coordinate dtype (float32 from load_l2_file), which is
+    # ample for ~1e-4 deg L2 geolocation and halves memory traffic.
+
+    @cached_property
+    def lat_rad(self) -> np.ndarray:
+        return np.deg2rad(self.lat)
+
+    @cached_property
+    def lon_rad(self) -> np.ndarray:
+        return np.deg2rad(self.lon)
+
+    @cached_property
+    def cos_lat(self) -> np.ndarray:
+        return np.cos(self.lat_rad)
+
+    @cached_property
+    def sin_lat(self) -> np.ndarray:
+        return np.sin(self.lat_rad)
+
+
+_GRANULE_DT_RE = re.compile(r"\.(\d{8})T(\d{6})\.")
 
 
 def parse_granule_datetime_from_filename(path: str) -> Optional[datetime]:
@@ -26,11 +81,15 @@ def parse_granule_datetime_from_filename(path: str) -> Optional[datetime]:
     Extract YYYYMMDDTHHMMSS from common OB.DAAC L2 filenames.
     Example: AQUA_MODIS.20240520T191501.L2.SST.nc -> 2024-05-20 19:15:01Z
     """
-    m = re.search(r"\.(\d{8})T(\d{6})\.", path)
+    m = _GRANULE_DT_RE.search(path)
     if not m:
         return None
-    dt = datetime.strptime(m.group(1) + m.group(2), "%Y%m%d%H%M%S")
-    return dt.replace(tzinfo=timezone.utc)
+    d, t = m.group(1), m.group(2)
+    return datetime(
+        int(d[0:4]), int(d[4:6]), int(d[6:8]),
+        int(t[0:2]), int(t[2:4]), int(t[4:6]),
+        tzinfo=timezone.utc,
+    )
 
 
 def _get_group(ds: Dataset, name: str):
@@ -40,56 +99,221 @@ def _get_group(ds: Dataset, name: str):
     return ds.groups.get(name, ds)
 
 
+def _prefetch_enabled() -> bool:
+    return os.environ.get("MATCHUP_PREFETCH", "") not in ("", "0")
+
+
+def _advise_willneed(path: str) -> None:
+    """
+    Ask the kernel to start reading the whole granule into the page cache,
+    so the chunk reads netCDF4 issues afterwards mostly hit memory.
+    Best effort: a no-op where posix_fadvise is unavailable or fails.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _scale_attrs(var):
+    """
+    Return (scale_factor, add_offset) the way netCDF4 would apply them,
+    with None for a term netCDF4 would skip.
+    """
+    scale = getattr(var, "scale_factor", None)
+    offset = getattr(var, "add_offset", None)
+    if scale is not None and np.all(scale == 1.0):
+        scale = None
+    if offset is not None and np.all(offset == 0.0):
+        offset = None
+    return scale, offset
+
+
+def _packed_attr(var, name: str, raw: np.ndarray) -> np.ndarray:
+    """
+    Attribute values as a 1-D array of the packed type, viewed as
+    unsigned when raw was (see _Unsigned in _read_variable).
+    """
+    values = np.atleast_1d(np.asarray(var.getncattr(name)))
+    if raw.dtype.kind == "u" and values.dtype.kind == "i":
+        values = values.astype(_native(var.dtype)).view(_native(raw.dtype))
+    return values
+
+
+def _native(dtype) -> np.dtype:
+    return np.dtype(dtype).newbyteorder("=")
+
+
+def _invalid_mask(var, raw: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Boolean mask of the packed values to drop, following netCDF4's
+    auto-masking: _FillValue (or, without one, netCDF's default fill for
+    the type, except for bytes), missing_value, and values outside
+    valid_range, or valid_min/valid_max when there is no two-element
+    valid_range. None when none of these apply.
+    """
+    attrs = var.ncattrs()
+    invalid = None
+
+    def _or(mask):
+        nonlocal invalid
+        invalid = mask if invalid is None else (invalid | mask)
+
+    for name in ("_FillValue", "missing_value"):
+        if name in attrs:
+            for value in _packed_attr(var, name, raw):
+                _or(raw == value)
+    packed_type = np.dtype(var.dtype).str[1:]
+    if "_FillValue" not in attrs and packed_type not in ("i1", "u1"):
+        fill = np.array(default_fillvals[packed_type], dtype=_native(var.dtype))
+        if raw.dtype.kind != fill.dtype.kind:
+            fill = fill.view(_native(raw.dtype))
+        _or(raw == fill)
+
+    lo = hi = None
+    valid_range = _packed_attr(var, "valid_range", raw) if "valid_range" in attrs else None
+    if valid_range is not None and valid_range.size == 2:
+        lo, hi = valid_range
+    else:
+        if "valid_min" in attrs:
+            lo = _packed_attr(var, "valid_min", raw)[0]
+        if "valid_max" in attrs:
+            hi = _packed_attr(var, "valid_max", raw)[0]
+    if lo is not None:
+        _or(raw < lo)
+    if hi is not None:
+        _or(raw > hi)
+    return invalid
+
+
+def _read_variable(var, dtype=None, mask_invalid: bool = True) -> np.ndarray:
+    """
+    Read a whole netCDF variable as a plain ndarray.
+
+    The packed values are read once with netCDF4's mask-and-scale turned
+    off, so no masked array is built and copied out of. _Unsigned="true"
+    integers are viewed as unsigned first, as netCDF4 does. Pixels
+    netCDF4 would have masked (see _invalid_mask) are set to NaN on the
+    scaled array, where the matcher's isfinite checks drop them; integer
+    data that needs this is promoted to float. mask_invalid=False returns
+    the packed values untouched (used for l2_flags).
+    """
+    var.set_auto_maskandscale(False)
+    raw = np.asarray(var[:])
+    if not mask_invalid:
+        if dtype is not None and raw.dtype != dtype:
+            raw = raw.astype(dtype)
+        return raw
+
+    if getattr(var, "_Unsigned", "") in ("true", "True") and raw.dtype.kind == "i":
+        raw = raw.view(raw.dtype.str.replace("i", "u"))
+
+    invalid = _invalid_mask(var, raw)
+    if invalid is not None and not invalid.any():
+        invalid = None
+
+    scale, offset = _scale_attrs(var)
+    out_dtype = raw.dtype
+    for term in (scale, offset):
+        if term is not None:
+            out_dtype = np.result_type(out_dtype, np.asarray(term).dtype)
+    if dtype is not None:
+        out_dtype = np.dtype(dtype)
+    if invalid is not None and not np.issubdtype(out_dtype, np.floating):
+        out_dtype = np.dtype(np.float64)
+
+    data = raw if raw.dtype == out_dtype else raw.astype(out_dtype)
+    if scale is not None:
+        np.multiply(data, scale, out=data, casting="unsafe")
+    if offset is not None:
+        np.add(data, offset, out=data, casting="unsafe")
+    if invalid is not None:
+        data[invalid] = np.nan
+    return data
+
+
+def _as_uint32_flags(data: np.ndarray) -> np.ndarray:
+    """
+    Return l2_flags as uint32, reinterpreting 32-bit integers in place
+    rather than copying them.
+    """
+    if data.dtype == np.uint32:
+        return data
+    if data.dtype == np.int32 and data.flags.c_contiguous:
+        return data.view(np.uint32)
+    return data.astype(np.uint32)
+
+
 def load_l2_file(
     path: str,
     variable_names: Iterable[str],
     flags_candidate_names: Optional[Sequence[str]] = None,
+    coord_dtype=np.float32,
 ) -> L2Grid:
     """
     Load a modern OB.DAAC L2 NetCDF-4 file.
 
+    lat/lon are stored as coord_dtype (float32 by default, the on-disk
+    type for OB.DAAC L2 navigation data).
+
     Notes on time:
       - Some L2 files do not include per-pixel or per-scanline time arrays.
       - We therefore always parse a granule reference datetime from the filename
         (granule_datetime_utc) as a reliable fallback for matchup_min_dt_sec.
+
+    Set MATCHUP_PREFETCH=1 to issue a readahead hint for the granule before
+    opening it (helps batch runs over many granules on cold storage).
     """
     if flags_candidate_names is None:
         flags_candidate_names = ["l2_flags", "flags", "l2_flags_1"]
 
-    ds = Dataset(path, "r")
-
-    nav = _get_group(ds, "navigation_data")
-    geo = _get_group(ds, "geophysical_data")
-
-    lat = np.array(nav.variables["latitude"][:], copy=True)
-    lon = np.array(nav.variables["longitude"][:], copy=True)
-
-    # optional per-pixel or per-scanline time (rare/non-standard across sensors/products)
-    time_array = None
-    for cand in ("time", "utctime", "scan_time"):
-        if cand in nav.variables:
-            time_array = np.array(nav.variables[cand][:], copy=True)
-            break
-        if cand in geo.variables:
-            time_array = np.array(geo.variables[cand][:], copy=True)
-            break
-
-    variables: Dict[str, np.ndarray] = {}
-    for vname in variable_names:
-        vname = vname.strip()
-        if not vname:
-            continue
-        if vname not in geo.variables:
-            continue  # prototype: silently skip
-        variables[vname] = np.array(geo.variables[vname][:], copy=True)
-
-    flags_array = None
-    for cand in flags_candidate_names:
-        if cand in geo.variables:
-            flags_array = np.array(geo.variables[cand][:], copy=True).astype(np.uint32)
-            break
-
-    ds.close()
+    if _prefetch_enabled():
+        _advise_willneed(path)
+
+    # Reads stay on the calling thread: netcdf-c is not thread-safe, and
+    # concurrent reads from one Dataset (or several handles on one file)
+    # can crash the process rather than overlap decompression.
+    with Dataset(path, "r") as ds:
+        nav = _get_group(ds, "navigation_data")
+        geo = _get_group(ds, "geophysical_data")
+
+        lat = _read_variable(nav.variables["latitude"], coord_dtype)
+        lon = _read_variable(nav.variables["longitude"], coord_dtype)
+
+        # optional per-pixel or per-scanline time (rare/non-standard across sensors/products)
+        time_array = None
+        for cand in ("time", "utctime", "scan_time"):
+            if cand in nav.variables:
+                time_array = _read_variable(nav.variables[cand])
+                break
+            if cand in geo.variables:
+                time_array = _read_variable(geo.variables[cand])
+                break
+
+        variables: Dict[str, np.ndarray] = {}
+        for vname in variable_names:
+            vname = vname.strip()
+            if not vname or vname in variables:
+                continue
+            if vname not in geo.variables:
+                continue  # prototype: silently skip
+            variables[vname] = _read_variable(geo.variables[vname])
+
+        flags_array = None
+        for cand in flags_candidate_names:
+            if cand in geo.variables:
+                flags_array = _as_uint32_flags(
+                    _read_variable(geo.variables[cand], mask_invalid=False)
+                )
+                break
 
     granule_dt = parse_granule_datetime_from_filename(path)
 
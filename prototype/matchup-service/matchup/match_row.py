@@ -2,11 +2,31 @@
 
 from __future__ import annotations
 
+import itertools
+import math
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Sequence, Tuple, Any
 
 import numpy as np
 
+from matchup._kernels import (
+    NUMBA_AVAILABLE,
+    clear_bad_flag_pixels,
+    haversine_km_segments,
+    segment_stats,
+    window_pixel_counts,
+    window_pixel_indices,
+)
+from matchup.filters import (
+    _bbox_mask,
+    _chord_radius,
+    _ecef_points,
+    _float_dtype,
+    _haversine_from_prepared,
+    _pixel_tree,
+    _prepared_point,
+    _tree_query_workers,
+)
 from matchup.l2_loader import L2Grid
 from matchup.seabass_parser import SeaBASSRecord
 
@@ -15,149 +35,470 @@ from matchup.seabass_parser import SeaBASSRecord
 # Utilities
 # ----------------------------
 
+_EARTH_RADIUS_KM = 6371.0
+
+
 def haversine_km(lat1, lon1, lat2, lon2) -> np.ndarray:
     """
     Vectorized haversine distance.
     lat/lon in degrees. Returns km.
     """
-    R = 6371.0
-    lat1r = np.deg2rad(lat1)
-    lon1r = np.deg2rad(lon1)
-    lat2r = np.deg2rad(lat2)
-    lon2r = np.deg2rad(lon2)
+    return _haversine_term_to_km(_haversine_term(lat1, lon1, lat2, lon2))
+
+
+def _haversine_term(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """
+    The haversine term a = sin²(Δlat/2) + cos lat1 cos lat2 sin²(Δlon/2)
+    of haversine_km. Distance increases monotonically with a, so a can be
+    minimized first and only the minimum converted to km.
+
+    Always computed in float64: float32 inputs (L2 coordinates) are
+    widened inside the first ufunc rather than copied up front. A scalar
+    first point goes through math, which is cheaper than NumPy on
+    scalars.
+    """
+    if np.ndim(lat1) == 0 and np.ndim(lon1) == 0:
+        lat1r = math.radians(lat1)
+        lon1r = math.radians(lon1)
+        cos_lat1 = math.cos(lat1r)
+    else:
+        lat1r = np.deg2rad(lat1, dtype=np.float64)
+        lon1r = np.deg2rad(lon1, dtype=np.float64)
+        cos_lat1 = np.cos(lat1r)
+    lat2r = np.deg2rad(lat2, dtype=np.float64)
+    lon2r = np.deg2rad(lon2, dtype=np.float64)
     dlat = lat2r - lat1r
     dlon = lon2r - lon1r
-    a = np.sin(dlat / 2.0) ** 2 + np.cos(lat1r) * np.cos(lat2r) * np.sin(dlon / 2.0) ** 2
-    return 2.0 * R * np.arcsin(np.sqrt(a))
+    return np.sin(dlat / 2.0) ** 2 + cos_lat1 * np.cos(lat2r) * np.sin(dlon / 2.0) ** 2
 
 
-def _compute_min_distance_km(seabass_rec: SeaBASSRecord, l2: L2Grid, rows: np.ndarray, cols: np.ndarray) -> Optional[float]:
-    if rows.size == 0:
-        return None
-    lat = l2.lat[rows, cols].astype("float64")
-    lon = l2.lon[rows, cols].astype("float64")
-    d = haversine_km(seabass_rec.lat, seabass_rec.lon, lat, lon)
-    d = d[np.isfinite(d)]
-    if d.size == 0:
-        return None
-    return float(np.min(d))
+def _haversine_term_to_km(a: np.ndarray) -> np.ndarray:
+    return 2.0 * _EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
 
 
-def _compute_time_metrics_from_l2_time(
+def _subset_window_indices(
     seabass_rec: SeaBASSRecord,
     l2: L2Grid,
-    rows: np.ndarray,
-    cols: np.ndarray,
-) -> Optional[float]:
+    max_distance_km: float,
+) -> np.ndarray:
     """
-    Compute min |Δt| using l2.time if available.
+    Select all pixels within a radius of seabass point.
+    Returns flat (row-major) pixel indices into the grid.
 
-    Supports:
-      - per-pixel time: shape == l2.lat.shape
-      - per-line time:  1D array with length == number of rows in l2.lat
-    Assumes l2.time values are epoch seconds (float).
+    Uses the granule's pixel KD-tree if it has already been built;
+    otherwise a single record is cheaper to scan directly (compiled
+    with Numba when available), see _window_indices_batch.
     """
-    if rows.size == 0 or l2.time is None:
-        return None
+    return _window_indices_batch(*record_coordinates([seabass_rec]), l2, max_distance_km)[0]
 
-    try:
-        time_arr = np.asarray(l2.time, dtype="float64")
-    except Exception:
-        return None
 
-    center_sec = float(seabass_rec.time.timestamp())
+def _window_from_candidates(
+    rec_lat: np.ndarray,
+    rec_lon: np.ndarray,
+    l2: L2Grid,
+    flat_index: np.ndarray,
+    all_candidates: Sequence[Sequence[int]],
+    max_distance_km: float,
+    radius_km: float = 6371.0,
+) -> List[np.ndarray]:
+    """
+    Exact haversine check of KD-tree candidates (tree point numbers,
+    all_candidates[k] for record k). Returns per record the flat pixel
+    indices within max_distance_km, ascending, i.e. the same pixels and
+    order as a full-grid scan.
 
-    # Case 1: per-pixel
-    if time_arr.shape == l2.lat.shape:
-        pixel_times = time_arr[rows, cols]
-    # Case 2: per-scanline/per-row
-    elif time_arr.ndim == 1 and time_arr.shape[0] == l2.lat.shape[0]:
-        pixel_times = time_arr[rows]
+    The candidates of all records are concatenated and checked in one
+    pass (compiled with Numba when available) rather than per record.
+    """
+    n_records = rec_lat.size
+    counts = np.fromiter(map(len, all_candidates), dtype=np.intp, count=n_records)
+    seg = np.repeat(np.arange(n_records), counts)
+    idx = flat_index[
+        np.fromiter(itertools.chain.from_iterable(all_candidates), dtype=np.intp, count=seg.size)
+    ]
+    # Ascending pixels within each record: seg is already grouped, so one
+    # sort of (record, pixel) keys orders them without moving records
+    offset = seg.astype(np.int64) * l2.lat.size
+    idx = np.sort(idx + offset) - offset
+
+    # Same per-record terms (in the grid's float dtype) as a single-record
+    # check, so both select exactly the same pixels
+    dtype = l2.lat_rad.dtype
+    point = np.array(
+        [
+            _prepared_point(lat, lon, dtype)
+            for lat, lon in zip(rec_lat.tolist(), rec_lon.tolist())
+        ],
+        dtype=dtype,
+    ).reshape(-1, 3)
+    lat_rad, lon_rad, cos_lat = (
+        np.ascontiguousarray(a).reshape(-1) for a in (l2.lat_rad, l2.lon_rad, l2.cos_lat)
+    )
+    if NUMBA_AVAILABLE:
+        d = np.empty(idx.size, dtype=_float_dtype(lat_rad))
+        rec_terms = point.astype(np.float64).T
+        haversine_km_segments(
+            *rec_terms, seg, idx, lat_rad, lon_rad, cos_lat, float(radius_km), d
+        )
     else:
-        return None
-
-    diffs = np.abs(pixel_times - center_sec)
-    diffs = diffs[np.isfinite(diffs)]
-    if diffs.size == 0:
-        return None
-    return float(np.min(diffs))
+        d = _haversine_from_prepared(
+            *point[seg].T, lat_rad[idx], lon_rad[idx], cos_lat[idx], radius_km
+        )
+    # NaN distances (non-finite pixels) compare False
+    within = d <= max_distance_km
+    idx = idx[within]
+    offsets = np.zeros(n_records + 1, dtype=np.intp)
+    np.cumsum(np.bincount(seg[within], minlength=n_records), out=offsets[1:])
+    return [idx[offsets[k]:offsets[k + 1]] for k in range(n_records)]
 
 
-def _compute_min_dt_sec(
+def _subset_nearest_indices(
     seabass_rec: SeaBASSRecord,
     l2: L2Grid,
-    rows: np.ndarray,
-    cols: np.ndarray,
-) -> Optional[float]:
+) -> np.ndarray:
     """
-    Compute min |Δt| in seconds.
-    Prefer l2.time if available; otherwise fall back to l2.granule_datetime_utc.
+    Find the nearest pixel (great-circle) with a k=1 query on the
+    granule's cached pixel KD-tree.
+    Returns its flat index as a one-element array (empty if the grid has
+    no finite pixel).
     """
-    # 1) Prefer per-pixel/per-line time if present
-    dt = _compute_time_metrics_from_l2_time(seabass_rec, l2, rows, cols)
-    if dt is not None:
-        return dt
+    return _nearest_indices_batch(*record_coordinates([seabass_rec]), l2)[0]
 
-    # 2) Fallback: granule reference time parsed from filename
-    gdt = getattr(l2, "granule_datetime_utc", None)
-    if gdt is not None:
+
+def _nearest_indices_batch(
+    rec_lat: np.ndarray,
+    rec_lon: np.ndarray,
+    l2: L2Grid,
+) -> List[np.ndarray]:
+    """
+    _subset_nearest_indices for many record positions, as one tree query.
+    """
+    tree, flat_index = _pixel_tree(l2)
+    points = _ecef_points(rec_lat, rec_lon)
+    chord, nearest = tree.query(points, k=1, workers=_tree_query_workers())
+
+    # Missing neighbours (empty tree, non-finite record position) come
+    # back with an infinite distance and an out-of-range index.
+    found = np.isfinite(chord)
+    flat = np.zeros(rec_lat.size, dtype=np.intp)
+    flat[found] = flat_index[nearest[found]]
+    return [flat[k:k + 1] if found[k] else flat[:0] for k in range(rec_lat.size)]
+
+
+_STAT_FIELDS = (("mean", "f8"), ("median", "f8"), ("std", "f8"), ("n", "i8"))
+
+# (var, mean, median, std, n) output field names per variable
+_VariableColumns = Tuple[Tuple[str, str, str, str, str], ...]
+
+
+def matchup_output_dtype(variable_names: Sequence[str]) -> np.dtype:
+    """
+    Structured dtype holding the matchup columns of one SeaBASS record:
+    matchup_min_distance_km, matchup_min_dt_sec and sat_<var>_{mean,median,std,n}.
+    Missing values are NaN (n is 0).
+    """
+    fields = [("matchup_min_distance_km", "f8"), ("matchup_min_dt_sec", "f8")]
+    for v in dict.fromkeys(variable_names):
+        fields.extend((f"sat_{v}_{stat}", t) for stat, t in _STAT_FIELDS)
+    return np.dtype(fields)
+
+
+def _variable_columns(variable_names: Sequence[str]) -> _VariableColumns:
+    """
+    (var, mean, median, std, n) output field names per requested variable,
+    built once per call instead of formatted per record.
+    """
+    return tuple(
+        (v,) + tuple(f"sat_{v}_{stat}" for stat, _ in _STAT_FIELDS)
+        for v in variable_names
+    )
+
+
+def new_output_buffer(n_records: int, variable_names: Sequence[str]) -> np.ndarray:
+    """
+    Allocate matchup output rows for n_records, initialised to "no match".
+    """
+    out = np.empty(n_records, dtype=matchup_output_dtype(variable_names))
+    for name in out.dtype.names:
+        out[name] = 0 if out.dtype[name].kind == "i" else np.nan
+    return out
+
+
+def _row_to_dict(row: np.void) -> Dict[str, Any]:
+    """
+    Output row as the dict returned by match_record_to_l2 (None for missing).
+    """
+    result: Dict[str, Any] = {}
+    for name, value in zip(row.dtype.names, row.item()):
+        if isinstance(value, float) and value != value:
+            value = None
+        result[name] = value
+    return result
+
+
+def _segment_starts(seg: np.ndarray) -> np.ndarray:
+    """
+    Start offsets of the runs of equal (sorted) record numbers in seg.
+    """
+    return np.flatnonzero(np.r_[True, seg[1:] != seg[:-1]])
+
+
+def _segment_min(values: np.ndarray, seg: np.ndarray, n_records: int) -> np.ndarray:
+    """
+    Per-record minimum of the finite values; NaN for records with none.
+    """
+    out = np.full(n_records, np.nan)
+    if values.size:
+        # fmin skips NaN, so the values need no compacting first; only the
+        # per-record results are checked (a record with nothing but NaN/inf)
+        starts = _segment_starts(seg)
+        mins = np.fmin.reduceat(values, starts)
+        mins[~np.isfinite(mins)] = np.nan
+        out[seg[starts]] = mins
+    return out
+
+
+def record_epoch_seconds(records: Sequence[SeaBASSRecord]) -> np.ndarray:
+    """
+    Epoch seconds (float64) of each record's time, NaN where it has none.
+
+    Computed once per SeaBASS file; pass it to match_records_to_l2 as
+    record_epoch_sec to avoid converting the datetimes again per granule.
+    """
+    out = np.full(len(records), np.nan)
+    for k, rec in enumerate(records):
         try:
-            return float(abs(gdt.timestamp() - seabass_rec.time.timestamp()))
+            out[k] = rec.time.timestamp()
         except Exception:
-            return None
+            pass
+    return out
 
-    return None
 
+def record_coordinates(records: Sequence[SeaBASSRecord]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    (lat, lon) float64 arrays of the records' positions.
 
-def _apply_flag_mask(flags: np.ndarray, bad_flag_mask: int) -> np.ndarray:
+    SeaBASSData already carries these as its lat/lon columns; pass those
+    to match_records_to_l2 as record_lat/record_lon instead.
     """
-    Returns boolean array True where pixel is GOOD (i.e., no bad flags set).
-    flags is uint bitmask array; bad_flag_mask is int.
+    n = len(records)
+    lat = np.fromiter((r.lat for r in records), dtype=np.float64, count=n)
+    lon = np.fromiter((r.lon for r in records), dtype=np.float64, count=n)
+    return lat, lon
+
+
+def _granule_dt(rec_epoch: np.ndarray, l2: L2Grid) -> np.ndarray:
     """
-    return (flags & np.uint32(bad_flag_mask)) == 0
+    |Δt| (s) between each record and l2.granule_datetime_utc, NaN where unknown.
+    """
+    gdt = getattr(l2, "granule_datetime_utc", None)
+    if gdt is None:
+        return np.full(rec_epoch.shape, np.nan)
+    return np.abs(gdt.timestamp() - rec_epoch)
 
 
-def _subset_window_indices(
-    seabass_rec: SeaBASSRecord,
+def _pixel_dt_sec(
+    rec_epoch: np.ndarray,
     l2: L2Grid,
-    max_distance_km: float,
-) -> Tuple[np.ndarray, np.ndarray]:
+    idx: np.ndarray,
+    seg: np.ndarray,
+) -> Optional[np.ndarray]:
     """
-    Select all pixels within a radius of seabass point.
-    Returns (rows, cols) index arrays.
+    |Δt| in seconds between each given pixel and its record, from l2.time;
+    None if the granule has no usable time array.
+
+    l2.time may be per-pixel (shape == l2.lat.shape) or per-line (one
+    value per row of a 2D grid), in epoch seconds (float64, see L2Grid).
     """
-    d = haversine_km(seabass_rec.lat, seabass_rec.lon, l2.lat.astype("float64"), l2.lon.astype("float64"))
-    mask = np.isfinite(d) & (d <= max_distance_km)
-    rows, cols = np.where(mask)
-    return rows, cols
+    if l2.time is None:
+        return None
+    if l2.time.shape == l2.lat.shape:
+        pixel_times = l2.time.ravel()[idx]
+    elif l2.time_is_per_line:
+        pixel_times = l2.time[idx // l2.lat.shape[1]]
+    else:
+        return None
+    return np.abs(pixel_times - rec_epoch[seg])
 
 
-def _subset_nearest_indices(
-    seabass_rec: SeaBASSRecord,
-    l2: L2Grid,
-) -> Tuple[np.ndarray, np.ndarray]:
+def _min_dt_sec(
+    pixel_dt: Optional[np.ndarray],
+    seg: np.ndarray,
+    granule_dt: np.ndarray,
+) -> np.ndarray:
     """
-    Find nearest pixel by squared distance in lat/lon space (fast, good enough for prototype).
+    Per-record min |Δt| in seconds (NaN if unknown).
+    Prefer the per-pixel pixel_dt (from _pixel_dt_sec) if available;
+    otherwise fall back to granule_dt.
     """
-    dist2 = (l2.lat.astype("float64") - seabass_rec.lat) ** 2 + (l2.lon.astype("float64") - seabass_rec.lon) ** 2
-    i, j = np.unravel_index(np.nanargmin(dist2), dist2.shape)
-    return np.array([i], dtype=int), np.array([j], dtype=int)
+    if pixel_dt is None:
+        return granule_dt
+    dt = _segment_min(pixel_dt, seg, granule_dt.size)
+    return np.where(np.isnan(dt), granule_dt, dt)
 
 
-def _aggregate(values: np.ndarray) -> Dict[str, Any]:
+def _clear_bad_flags(l2: L2Grid, idx: np.ndarray, bad_flag_mask: int, keep: np.ndarray) -> None:
+    """
+    keep &= pixel idx has none of the bad_flag_mask bits set (in place).
+    """
+    flags = l2.flags
+    if NUMBA_AVAILABLE and flags.dtype == np.uint32 and flags.flags.c_contiguous:
+        clear_bad_flag_pixels(flags.reshape(-1), idx, np.uint32(bad_flag_mask), keep)
+        return
+    keep &= (flags.ravel()[idx].astype(np.uint32, copy=False) & np.uint32(bad_flag_mask)) == 0
+
+
+def _segment_stats_numpy(
+    values: np.ndarray,
+    starts: np.ndarray,
+    sizes: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    NumPy version of _kernels.segment_stats: (counts, mean, median, std),
+    each (n_vars, n_segments).
     """
-    Aggregate numeric values (expects 1D array of finite floats).
+    n_vars, n_pixels = values.shape
+
+    # One finite mask for every variable; non-finite values add nothing
+    finite = np.isfinite(values)
+    counts = np.add.reduceat(finite, starts, axis=1, dtype=np.intp)
+    filled = np.where(finite, values, 0.0)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = np.add.reduceat(filled, starts, axis=1) / counts
+        dev = np.where(finite, values - np.repeat(mean, sizes, axis=1), 0.0)
+        dev *= dev
+        # ddof=0: population std
+        std = np.sqrt(np.add.reduceat(dev, starts, axis=1) / counts)
+
+    # One sort for all variables: by (variable, record), then value, which
+    # puts each block's finite values first (NaN sorts last); medians are
+    # then picked by position.
+    block = np.repeat(np.arange(n_vars * starts.size), np.tile(sizes, n_vars))
+    flat = values.ravel()
+    ordered = flat[np.lexsort((flat, block))]
+    lo = (np.arange(n_vars)[:, np.newaxis] * n_pixels + starts) + (counts - 1) // 2
+    hi = (np.arange(n_vars)[:, np.newaxis] * n_pixels + starts) + counts // 2
+    median = np.where(counts > 0, (ordered[lo] + ordered[hi]) / 2.0, np.nan)
+
+    return counts, mean, median, std
+
+
+def _store_segment_stats(
+    values: np.ndarray,
+    seg: np.ndarray,
+    out: np.ndarray,
+    columns: _VariableColumns,
+) -> None:
     """
-    if values.size == 0:
-        return {"mean": None, "median": None, "std": None, "n": 0}
+    mean / median / population std / n of each record's finite values,
+    for all variables at once: values is (len(columns), n_pixels), one
+    row per variable, over the pixels tagged by seg. Non-finite values
+    are left out per variable; records without any keep "no match".
+    """
+    n_vars, n_pixels = values.shape
+    if n_vars == 0 or n_pixels == 0:
+        return
+
+    starts = _segment_starts(seg)
+    rec = seg[starts]
+    sizes = np.diff(np.r_[starts, n_pixels])
+
+    if NUMBA_AVAILABLE:
+        shape = (n_vars, starts.size)
+        counts = np.empty(shape, dtype=np.intp)
+        mean, median, std = np.empty(shape), np.empty(shape), np.empty(shape)
+        segment_stats(np.ascontiguousarray(values), starts, sizes, counts, mean, median, std)
+    else:
+        counts, mean, median, std = _segment_stats_numpy(values, starts, sizes)
+
+    for k, (_, mean_f, median_f, std_f, n_f) in enumerate(columns):
+        out[mean_f][rec] = mean[k]
+        out[median_f][rec] = median[k]
+        out[std_f][rec] = std[k]
+        out[n_f][rec] = counts[k]
+
+
+def _match_selected_pixels(
+    rec_lat: np.ndarray,
+    rec_lon: np.ndarray,
+    l2: L2Grid,
+    selections: Sequence[np.ndarray],
+    columns: _VariableColumns,
+    max_time_diff_sec: float,
+    bad_flag_mask: Optional[int],
+    rec_epoch: np.ndarray,
+    out: np.ndarray,
+) -> None:
+    """
+    Time gate, flag filter and aggregation for pixels already selected
+    spatially, for all records at once.
+
+    selections[k] holds the flat grid indices selected for the record at
+    (rec_lat[k], rec_lon[k]).
+    They are concatenated into one pixel list tagged with the record
+    number, so every step below is a single array pass plus per-record
+    reductions rather than a Python loop over records. Writes into out,
+    rows of new_output_buffer() still holding "no match"; columns comes
+    from _variable_columns(); rec_epoch from record_epoch_seconds().
+    """
+    n_records = rec_lat.size
+    counts = np.fromiter((s.size for s in selections), dtype=np.intp, count=n_records)
+    if not counts.any():
+        # No spatial candidates
+        return
+
+    idx = np.concatenate(selections).astype(np.intp, copy=False)
+    seg = np.repeat(np.arange(n_records), counts)
+
+    # Only the per-record minimum distance is reported: keep the haversine
+    # term per pixel and convert just the minima to km.
+    hav = _haversine_term(
+        rec_lat[seg],
+        rec_lon[seg],
+        l2.lat.ravel()[idx],
+        l2.lon.ravel()[idx],
+    )
+    granule_dt = _granule_dt(rec_epoch, l2)
+    # Per-pixel distance and Δt are computed once here and re-indexed
+    # after the time gate / flag filter, not recomputed.
+    pixel_dt = _pixel_dt_sec(rec_epoch, l2, idx, seg)
+
+    # Time tolerance filter (if we can compute dt)
+    dt_all = _min_dt_sec(pixel_dt, seg, granule_dt)
+    too_far = dt_all > max_time_diff_sec
+    far = too_far[seg]
+    if too_far.any():
+        # Too far in time; treat as no match but still record dt and distance
+        out["matchup_min_dt_sec"][too_far] = dt_all[too_far]
+        out["matchup_min_distance_km"][too_far] = _haversine_term_to_km(
+            _segment_min(hav[far], seg[far], n_records)[too_far]
+        )
+
+    # Apply flag filter if available
+    keep = ~far
+    if bad_flag_mask is not None and l2.flags is not None:
+        _clear_bad_flags(l2, idx, int(bad_flag_mask), keep)
+    idx, seg, hav = idx[keep], seg[keep], hav[keep]
+    if idx.size == 0:
+        return
+    if pixel_dt is not None:
+        pixel_dt = pixel_dt[keep]
+
+    # Record metrics
+    matched = np.zeros(n_records, dtype=bool)
+    matched[seg] = True
+    out["matchup_min_distance_km"][matched] = _haversine_term_to_km(
+        _segment_min(hav, seg, n_records)[matched]
+    )
+    out["matchup_min_dt_sec"][matched] = _min_dt_sec(pixel_dt, seg, granule_dt)[matched]
 
-    # ddof=0: population std
-    return {
-        "mean": float(np.mean(values)),
-        "median": float(np.median(values)),
-        "std": float(np.std(values, ddof=0)),
-        "n": int(values.size),
-    }
+    # Aggregate the requested variables present in the granule together
+    present = tuple(c for c in columns if c[0] in l2.variables)
+    values = np.empty((len(present), idx.size), dtype="float64")
+    for k, (v, *_) in enumerate(present):
+        values[k] = l2.variables[v].ravel()[idx]
+    _store_segment_stats(values, seg, out, present)
 
 
 # ----------------------------
@@ -172,82 +513,243 @@ def match_record_to_l2(
     max_time_diff_sec: float,
     bad_flag_mask: Optional[int] = None,
     mode: str = "window",
+    rec_epoch_sec: Optional[float] = None,
 ) -> Dict[str, Any]:
     """
     Match one SeaBASS record against one L2 granule and return computed matchup columns.
-    """
-    result: Dict[str, Any] = {
-        "matchup_min_distance_km": None,
-        "matchup_min_dt_sec": None,
-    }
 
+    rec_epoch_sec, if given, is seabass_rec.time in epoch seconds (see
+    record_epoch_seconds).
+    """
     if mode not in ("window", "nearest"):
         raise ValueError(f"Unsupported mode: {mode}")
 
     # Select pixels
     if mode == "nearest":
-        rows, cols = _subset_nearest_indices(seabass_rec, l2)
+        idx = _subset_nearest_indices(seabass_rec, l2)
     else:
-        rows, cols = _subset_window_indices(seabass_rec, l2, max_distance_km)
+        idx = _subset_window_indices(seabass_rec, l2, max_distance_km)
 
-    if rows.size == 0:
-        # No spatial candidates
-        for v in variable_names:
-            result[f"sat_{v}_mean"] = None
-            result[f"sat_{v}_median"] = None
-            result[f"sat_{v}_std"] = None
-            result[f"sat_{v}_n"] = 0
-        return result
+    if rec_epoch_sec is None:
+        rec_epoch = record_epoch_seconds([seabass_rec])
+    else:
+        rec_epoch = np.array([rec_epoch_sec], dtype="float64")
 
-    # Time tolerance filter (if we can compute dt)
-    dt_min = _compute_min_dt_sec(seabass_rec, l2, rows, cols)
-    if dt_min is not None and dt_min > max_time_diff_sec:
-        # Too far in time; treat as no match
-        for v in variable_names:
-            result[f"sat_{v}_mean"] = None
-            result[f"sat_{v}_median"] = None
-            result[f"sat_{v}_std"] = None
-            result[f"sat_{v}_n"] = 0
-        # still record dt_min for debugging if you want:
-        result["matchup_min_dt_sec"] = dt_min
-        # and distance:
-        result["matchup_min_distance_km"] = _compute_min_distance_km(seabass_rec, l2, rows, cols)
-        return result
+    out = new_output_buffer(1, variable_names)
+    _match_selected_pixels(
+        *record_coordinates([seabass_rec]), l2, [idx], _variable_columns(variable_names),
+        max_time_diff_sec, bad_flag_mask, rec_epoch, out,
+    )
+    return _row_to_dict(out[0])
 
-    # Apply flag filter if available
-    if bad_flag_mask is not None and l2.flags is not None:
-        good = _apply_flag_mask(l2.flags[rows, cols].astype(np.uint32), int(bad_flag_mask))
-        rows = rows[good]
-        cols = cols[good]
-        if rows.size == 0:
-            for v in variable_names:
-                result[f"sat_{v}_mean"] = None
-                result[f"sat_{v}_median"] = None
-                result[f"sat_{v}_std"] = None
-                result[f"sat_{v}_n"] = 0
-            return result
 
-    # Record metrics
-    result["matchup_min_distance_km"] = _compute_min_distance_km(seabass_rec, l2, rows, cols)
-    result["matchup_min_dt_sec"] = _compute_min_dt_sec(seabass_rec, l2, rows, cols)
-
-    # Aggregate each requested variable
-    for v in variable_names:
-        arr = l2.variables.get(v)
-        if arr is None:
-            result[f"sat_{v}_mean"] = None
-            result[f"sat_{v}_median"] = None
-            result[f"sat_{v}_std"] = None
-            result[f"sat_{v}_n"] = 0
-            continue
-
-        vals = arr[rows, cols].astype("float64")
-        vals = vals[np.isfinite(vals)]
-        stats = _aggregate(vals)
-
-        result[f"sat_{v}_mean"] = stats["mean"]
-        result[f"sat_{v}_median"] = stats["median"]
-        result[f"sat_{v}_std"] = stats["std"]
-        result[f"sat_{v}_n"] = stats["n"]
+# ----------------------------
+# Batched matcher
+# ----------------------------
 
-    return result
+# Building the pixel KD-tree costs about as much as this many full-swath
+# scans (measured on a 2030x1354 MODIS granule: ~1.1 s build vs ~5 ms per
+# compiled scan or ~4 ms per NumPy box-prefiltered scan). Fewer records
+# than this are scanned directly unless the tree already exists.
+_TREE_MIN_RECORDS = 256
+
+
+def _window_indices_batch(
+    rec_lat: np.ndarray,
+    rec_lon: np.ndarray,
+    l2: L2Grid,
+    max_distance_km: float,
+) -> List[np.ndarray]:
+    """
+    Window selection (flat pixel indices, as _subset_window_indices) for
+    every record position (float64 degree arrays), using whichever of the
+    KD-tree, the compiled scan or the NumPy broadcast is cheapest for this
+    many records.
+    """
+    if not max_distance_km >= 0:
+        return [np.empty(0, dtype=np.intp) for _ in range(rec_lat.size)]
+
+    if l2._tree is not None or rec_lat.size >= _TREE_MIN_RECORDS:
+        return _window_indices_tree(rec_lat, rec_lon, l2, max_distance_km)
+    if NUMBA_AVAILABLE:
+        return _window_indices_compiled(rec_lat, rec_lon, l2, max_distance_km)
+    return _window_indices_bbox(rec_lat, rec_lon, l2, max_distance_km)
+
+
+def _window_indices_tree(
+    rec_lat: np.ndarray,
+    rec_lon: np.ndarray,
+    l2: L2Grid,
+    max_distance_km: float,
+) -> List[np.ndarray]:
+    """
+    Window selection through the granule's pixel KD-tree (built once and
+    cached on the L2Grid): a ball query per record, then the exact
+    haversine on the candidates only.
+    """
+    tree, flat_index = _pixel_tree(l2)
+    all_candidates = tree.query_ball_point(
+        _ecef_points(rec_lat, rec_lon),
+        r=_chord_radius(max_distance_km),
+        workers=_tree_query_workers(),
+    )
+    return _window_from_candidates(
+        rec_lat, rec_lon, l2, flat_index, all_candidates, max_distance_km
+    )
+
+
+def _window_indices_bbox(
+    rec_lat: np.ndarray,
+    rec_lon: np.ndarray,
+    l2: L2Grid,
+    max_distance_km: float,
+) -> List[np.ndarray]:
+    """
+    NumPy window selection: a conservative lat/lon box per record, then
+    the exact haversine only on the pixels inside it.
+    """
+    lat_rad = l2.lat_rad.ravel()
+    lon_rad = l2.lon_rad.ravel()
+    cos_lat = l2.cos_lat.ravel()
+    selected: List[np.ndarray] = []
+
+    for lat, lon in zip(rec_lat.tolist(), rec_lon.tolist()):
+        idx = np.flatnonzero(_bbox_mask(l2, lat, lon, max_distance_km))
+        d = _haversine_from_prepared(
+            *_prepared_point(lat, lon, l2.lat_rad.dtype),
+            lat_rad[idx], lon_rad[idx], cos_lat[idx],
+        )
+        selected.append(idx[d <= max_distance_km])
+
+    return selected
+
+
+def _window_indices_compiled(
+    rec_lat: np.ndarray,
+    rec_lon: np.ndarray,
+    l2: L2Grid,
+    max_distance_km: float,
+    radius_km: float = 6371.0,
+) -> List[np.ndarray]:
+    """
+    Window selection for all records in one compiled pass per record
+    (records in parallel), without a records x pixels distance array.
+    Returns the flat pixel indices per record, as _subset_window_indices.
+    """
+    lat_rad, lon_rad, cos_lat = _prepared_point(rec_lat, rec_lon, l2.lat_rad.dtype)
+    args = (
+        lat_rad.astype("float64"),
+        lon_rad.astype("float64"),
+        cos_lat.astype("float64"),
+        np.ascontiguousarray(l2.lat_rad).reshape(-1),
+        np.ascontiguousarray(l2.lon_rad).reshape(-1),
+        np.ascontiguousarray(l2.cos_lat).reshape(-1),
+        float(radius_km),
+        float(max_distance_km),
+        # Pad covers float32 rounding of the radians (~1e-7)
+        max_distance_km / radius_km + 1e-6,
+    )
+
+    counts = np.zeros(rec_lat.size, dtype=np.intp)
+    window_pixel_counts(*args, counts)
+    offsets = np.zeros(rec_lat.size + 1, dtype=np.intp)
+    np.cumsum(counts, out=offsets[1:])
+    indices = np.empty(offsets[-1], dtype=np.intp)
+    window_pixel_indices(*args, offsets, indices)
+
+    return [indices[offsets[k]:offsets[k + 1]] for k in range(rec_lat.size)]
+
+
+def _distinct_records(
+    rec_lat: np.ndarray,
+    rec_lon: np.ndarray,
+    rec_epoch: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Group records with exactly the same (lat, lon, epoch time).
+
+    Returns (first, inverse): the index of the first record of each
+    group, and the group number of every record, so that
+    records[first[inverse[k]]] matches like records[k]. Records without
+    a time (NaN) are never grouped.
+    """
+    groups: Dict[Tuple[float, float, float], int] = {}
+    first: List[int] = []
+    inverse = np.empty(rec_lat.size, dtype=np.intp)
+    keys = zip(rec_lat.tolist(), rec_lon.tolist(), rec_epoch.tolist())
+    for k, key in enumerate(keys):
+        g = groups.get(key)
+        if g is None:
+            g = groups[key] = len(first)
+            first.append(k)
+        inverse[k] = g
+    return np.array(first, dtype=np.intp), inverse
+
+
+def match_records_to_l2(
+    records: Sequence[SeaBASSRecord],
+    l2: L2Grid,
+    variable_names: Sequence[str],
+    max_distance_km: float,
+    max_time_diff_sec: float,
+    bad_flag_mask: Optional[int] = None,
+    mode: str = "window",
+    record_epoch_sec: Optional[np.ndarray] = None,
+    record_lat: Optional[np.ndarray] = None,
+    record_lon: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Match many SeaBASS records against one L2 granule.
+
+    Returns one row of new_output_buffer() per record, holding the same
+    values match_record_to_l2 would return (NaN where it returns None),
+    without building a dict per record.
+
+    Window selection uses the granule's pixel KD-tree when there are
+    enough records to pay for building it (or it already exists), and
+    otherwise scans the swath once per record, compiled with Numba or
+    through a lat/lon box prefilter in NumPy; either way the grid-side
+    terms cached on the L2Grid are shared by all records. Nearest mode
+    is one k=1 query on the same tree. Time gate, flags and stats then
+    only touch the selected pixels.
+
+    record_epoch_sec is record_epoch_seconds(records), and
+    record_lat/record_lon are record_coordinates(records) (e.g. the
+    SeaBASSData lat/lon columns); each is computed here if not given.
+    """
+    if mode not in ("window", "nearest"):
+        raise ValueError(f"Unsupported mode: {mode}")
+
+    results = new_output_buffer(len(records), variable_names)
+    if len(records) == 0:
+        return results
+    columns = _variable_columns(variable_names)
+    if record_epoch_sec is None:
+        record_epoch_sec = record_epoch_seconds(records)
+    record_epoch_sec = np.asarray(record_epoch_sec, dtype="float64")
+    if record_lat is None or record_lon is None:
+        record_lat, record_lon = record_coordinates(records)
+    record_lat = np.asarray(record_lat, dtype="float64")
+    record_lon = np.asarray(record_lon, dtype="float64")
+
+    # Matchups depend only on position and time; depth profiles and
+    # replicates repeat those over many rows, so match each once.
+    first, inverse = _distinct_records(record_lat, record_lon, record_epoch_sec)
+    if first.size < len(records):
+        distinct = match_records_to_l2(
+            [records[k] for k in first], l2, variable_names, max_distance_km,
+            max_time_diff_sec, bad_flag_mask, mode, record_epoch_sec[first],
+            record_lat[first], record_lon[first],
+        )
+        return distinct[inverse]
+
+    if mode == "window":
+        selections = _window_indices_batch(record_lat, record_lon, l2, max_distance_km)
+    else:
+        selections = _nearest_indices_batch(record_lat, record_lon, l2)
+
+    _match_selected_pixels(
+        record_lat, record_lon, l2, selections, columns, max_time_diff_sec, bad_flag_mask,
+        record_epoch_sec, results,
+    )
+    return results
@@ -20,10 +20,19 @@ Main entry point:
 It reads a SeaBASS file and an OB.DAAC L2 file, performs matchups for
 each SeaBASS record, and writes an augmented SeaBASS-style file with
 additional satellite-derived columns.
+
+append_satellite_to_seabass_many runs it for several file pairs, in a
+pool of worker processes.
 """
 
 from __future__ import annotations
-from typing import Any, Dict, List, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import os
+
+import numpy as np
 
 from .seabass_parser import (
     parse_seabass_file,
@@ -34,7 +43,13 @@ from .l2_loader import (
     load_l2_file,
     L2Grid,
 )
-from .match_row import match_record_to_l2
+from .match_row import match_records_to_l2
+
+
+# Output rows are joined and written this many at a time
+_WRITE_CHUNK_ROWS = 4096
+_WRITE_BUFFER_BYTES = 1 << 20
+
 
 def _delimiter_char(delim_token: str | None) -> str:
     """
@@ -75,57 +90,98 @@ def _format_value(value: Any, missing_token: str, float_precision: int = 10) ->
     return str(value)
 
 
-def _format_original_field(field: str, rec, header: Dict[str, Any]) -> str:
+@lru_cache(maxsize=8192)
+def _strftime(t: datetime, fmt: str) -> str:
+    """
+    t.strftime(fmt), cached: SeaBASS files often repeat the same
+    timestamp over many rows (several depths or replicates per station).
+    """
+    return t.strftime(fmt)
+
+
+def _original_field_formatter(field: str, missing: str) -> Callable[[Any], str]:
     """
-    Format original SeaBASS fields with SeaBASS-friendly conventions:
+    Formatter (rec -> str) for one original SeaBASS field, with
+    SeaBASS-friendly conventions:
       - date: yyyymmdd
       - time: HH:MM:SS
       - datetime (if present): ISO-like without timezone suffix
       - lat/lon: decimal degrees (reasonable precision)
     """
-    missing = str(header.get("missing", "NaN"))
     lf = field.lower()
 
     if lf == "date":
-        return rec.time.strftime("%Y%m%d")
+        return lambda rec: _strftime(rec.time, "%Y%m%d")
     if lf == "time":
-        return rec.time.strftime("%H:%M:%S")
+        return lambda rec: _strftime(rec.time, "%H:%M:%S")
     if lf == "datetime":
-        return rec.time.strftime("%Y-%m-%dT%H:%M:%S")
+        return lambda rec: _strftime(rec.time, "%Y-%m-%dT%H:%M:%S")
     if lf == "lat":
-        return f"{rec.lat:.6f}".rstrip("0").rstrip(".")
+        return lambda rec: f"{rec.lat:.6f}".rstrip("0").rstrip(".")
     if lf == "lon":
-        return f"{rec.lon:.6f}".rstrip("0").rstrip(".")
+        return lambda rec: f"{rec.lon:.6f}".rstrip("0").rstrip(".")
     if lf in ("depth", "z"):
-        return _format_value(rec.depth, missing)
+        return lambda rec: _format_value(rec.depth, missing)
 
-    v = rec.variables.get(field)
-    return _format_value(v, missing)
+    return lambda rec: _format_value(rec.variables.get(field), missing)
 
 
-def _format_record_row(
-    rec,
-    sat_cols: Dict[str, Any],
+def _compile_row_formatter(
     original_fields: Sequence[str],
-    new_fields: Sequence[str],
     header: Dict[str, Any],
-) -> List[str]:
+) -> Callable[[Any], List[str]]:
     """
-    Construct full output row values list (original fields + appended matchup fields).
+    Build once per file a function returning a record's original fields,
+    formatted, in the original order. The per-field dispatch is resolved
+    here rather than for every row.
     """
     missing = str(header.get("missing", "NaN"))
+    formatters = [_original_field_formatter(field, missing) for field in original_fields]
 
-    values: List[str] = []
+    def format_row(rec) -> List[str]:
+        return [fmt(rec) for fmt in formatters]
 
-    # 1) Original fields in the original order
-    for field in original_fields:
-        values.append(_format_original_field(field, rec, header))
+    return format_row
 
-    # 2) New appended fields in the order new_fields[len(original_fields):]
-    for field in new_fields[len(original_fields):]:
-        values.append(_format_value(sat_cols.get(field), missing))
 
-    return values
+def _format_column(values: np.ndarray, missing_token: str, float_precision: int = 10) -> List[str]:
+    """
+    Format one column of the structured matchup array, with the same
+    output as _format_value per element. The dtype is checked once per
+    column instead of once per value: float columns (NaN -> missing) and
+    integer count columns each have a dedicated loop.
+    """
+    items = values.tolist()
+    if values.dtype.kind == "f":
+        fmt = f"{{:.{float_precision}g}}".format
+        return [fmt(v) if v == v else missing_token for v in items]
+    if values.dtype.kind in "iu":
+        return list(map(str, items))
+    return [_format_value(v, missing_token, float_precision) for v in items]
+
+
+def _format_matchup_columns(
+    matches: np.ndarray,
+    fields: Sequence[str],
+    missing_token: str,
+) -> List[tuple]:
+    """
+    Format the appended matchup columns for all records, one column at a time.
+
+    matches is the structured array from match_records_to_l2; fields not in
+    it are written as missing. Returns one tuple of strings per record.
+    """
+    names = matches.dtype.names or ()
+    columns = []
+    for field in fields:
+        if field in names:
+            columns.append(_format_column(matches[field], missing_token))
+        else:
+            columns.append([missing_token] * len(matches))
+    if not columns:
+        return [()] * len(matches)
+    return list(zip(*columns))
+
 
 def _get_delimiter_from_header(header: Dict[str, Any]) -> str:
     token = header.get("delimiter", "tab").lower()
@@ -287,35 +343,105 @@ def append_satellite_to_seabass(
         header_out.append("/units=" + ",".join(new_units))
 
     # Ensure output directory exists
-    import os
     os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
 
     # Write output file
-    with open(output_path, "w", encoding="utf-8", newline="\n") as out:
+    with open(
+        output_path, "w", encoding="utf-8", newline="\n", buffering=_WRITE_BUFFER_BYTES
+    ) as out:
         # Header
         for line in header_out:
             out.write(line.rstrip("\n") + "\n")
 
-        # Data rows
-        for rec in seabass.records:
-            sat_cols = match_record_to_l2(
-                seabass_rec=rec,
-                l2=l2,
-                variable_names=variable_names,
-                max_distance_km=max_distance_km,
-                max_time_diff_sec=max_time_diff_sec,
-                bad_flag_mask=bad_flag_mask,
-                mode=mode,
-            )
-
-            row_vals = _format_record_row(
-                rec=rec,
-                sat_cols=sat_cols,
-                original_fields=original_fields,
-                new_fields=new_fields,
-                header=seabass.header,
-            )
+        # Data rows (matchups computed for all records in batches)
+        matches = match_records_to_l2(
+            records=seabass.records,
+            l2=l2,
+            variable_names=variable_names,
+            max_distance_km=max_distance_km,
+            max_time_diff_sec=max_time_diff_sec,
+            bad_flag_mask=bad_flag_mask,
+            mode=mode,
+            record_epoch_sec=seabass.epoch_sec,
+            record_lat=seabass.lat,
+            record_lon=seabass.lon,
+        )
+
+        sat_rows = _format_matchup_columns(
+            matches,
+            new_fields[len(original_fields):],
+            str(seabass.header.get("missing", "NaN")),
+        )
+
+        format_row = _compile_row_formatter(original_fields, seabass.header)
+
+        # Rows are joined and written in chunks rather than one write per row
+        lines: List[str] = []
+        for rec, sat_values in zip(seabass.records, sat_rows):
+            # Original fields in the original order, then the appended
+            # matchup fields (already formatted by _format_matchup_columns)
+            row_vals = format_row(rec)
+            row_vals.extend(sat_values)
 
             # Use correct delimiter CHARACTER here ("," not "comma")
-            out.write(delim_char.join(row_vals) + "\n")
+            lines.append(delim_char.join(row_vals))
+            if len(lines) >= _WRITE_CHUNK_ROWS:
+                out.write("\n".join(lines) + "\n")
+                lines.clear()
+        if lines:
+            out.write("\n".join(lines) + "\n")
     return output_path
+
+
+def _init_worker(n_threads: int = 1) -> None:
+    """
+    Worker process initializer: import the matchup modules (and with them
+    numba and the compiled kernels, which load from numba's on-disk cache)
+    once per worker instead of inside the first job it runs.
+
+    The KD-tree queries and the parallel Numba kernels would each use all
+    CPUs in every worker; they are limited to n_threads so that the pool
+    as a whole does not run more threads than there are CPUs.
+    """
+    from . import _kernels, filters, l2_loader, match_row  # noqa: F401
+
+    _kernels.set_num_threads(n_threads)
+    filters.set_tree_query_workers(n_threads)
+
+
+def _run_pair(job: Tuple[str, str, str], params: Dict[str, Any]) -> str:
+    seabass_path, l2_path, output_path = job
+    return append_satellite_to_seabass(seabass_path, l2_path, params, output_path)
+
+
+def append_satellite_to_seabass_many(
+    jobs: Sequence[Tuple[str, str, str]],
+    params: Dict[str, Any],
+    max_workers: Optional[int] = None,
+) -> List[str]:
+    """
+    append_satellite_to_seabass for several (seabass_path, l2_path,
+    output_path) jobs, with the same params.
+
+    Parsing and matchup are mostly interpreter-bound, so jobs run in
+    separate processes (max_workers defaults to the CPU count) rather than
+    threads. A single job, or max_workers=1, runs in this process. The CPUs
+    are split between the worker processes: each one runs its KD-tree
+    queries and compiled kernels on cpu_count // workers threads (at least
+    one).
+
+    Returns the output paths, in job order.
+    """
+    jobs = list(jobs)
+    n_cpus = os.cpu_count() or 1
+    n_workers = min(max_workers or n_cpus, len(jobs))
+    if n_workers <= 1:
+        return [_run_pair(job, params) for job in jobs]
+
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        initializer=_init_worker,
+        initargs=(max(1, n_cpus // n_workers),),
+    ) as pool:
+        futures = [pool.submit(_run_pair, job, params) for job in jobs]
+        return [f.result() for f in futures]
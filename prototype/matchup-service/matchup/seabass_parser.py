@@ -1,29 +1,54 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
 
-import re
+import itertools
+
+import numpy as np
 
 
 # -----------------------------
 # Data structures
 # -----------------------------
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SeaBASSRecord:
     lat: float
     lon: float
     time: datetime
     depth: Optional[float]
-    variables: Dict[str, Any]   # includes all other fields (strings or floats)
+    variables: Dict[str, Any]   # all other fields (strings or floats)
 
 
 @dataclass
 class SeaBASSData:
     header: Dict[str, Any]
     records: List[SeaBASSRecord]
+    # Per-record columns (float64) for the numeric matchup path, passed to
+    # match_records_to_l2 as record_lat/record_lon/record_epoch_sec:
+    # epoch_sec is the UTC time in epoch seconds (NaN without a time).
+    # Filled in from records unless the parser passes them.
+    lat: Optional[np.ndarray] = field(default=None, repr=False, compare=False)
+    lon: Optional[np.ndarray] = field(default=None, repr=False, compare=False)
+    epoch_sec: Optional[np.ndarray] = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        n = len(self.records)
+        if self.lat is None:
+            self.lat = np.fromiter((r.lat for r in self.records), dtype=np.float64, count=n)
+        if self.lon is None:
+            self.lon = np.fromiter((r.lon for r in self.records), dtype=np.float64, count=n)
+        if self.epoch_sec is None:
+            self.epoch_sec = np.fromiter(
+                (_epoch_seconds(r.time) for r in self.records), dtype=np.float64, count=n
+            )
+
+
+# Fields carried by SeaBASSRecord's lat/lon/depth/time (the output writer
+# formats them from there) and so not repeated in its variables
+_RECORD_ATTRIBUTE_FIELDS = frozenset({"lat", "lon", "depth", "z", "date", "time", "datetime"})
 
 
 # -----------------------------
@@ -35,6 +60,24 @@ def _strip_bom(s: str) -> str:
     return s.lstrip("\ufeff")
 
 
+def _read_lines(path: str) -> List[str]:
+    """
+    The lines of a text file without line endings (\\n, \\r\\n or \\r, as
+    text-mode reading), from one read and one decode of the whole file
+    rather than a decode per line.
+    """
+    with open(path, "rb") as f:
+        text = f.read().decode("utf-8", errors="replace")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    lines = text.split("\n")
+    if lines[-1] == "":
+        lines.pop()  # the final newline (or an empty file)
+    if "\ufeff" in text:
+        lines = [_strip_bom(ln) for ln in lines]
+    return lines
+
+
 def _parse_kv_line(line: str) -> Optional[Tuple[str, str]]:
     """
     Parse a SeaBASS header kv line.
@@ -60,6 +103,24 @@ def _parse_kv_line(line: str) -> Optional[Tuple[str, str]]:
     return key.strip().lower(), val.strip()
 
 
+def _split_fields(val: str) -> List[str]:
+    return [v.strip() for v in val.split(",") if v.strip()]
+
+
+def _split_units(val: str) -> List[str]:
+    return [v.strip() for v in val.split(",")]
+
+
+# Header keys also stored as header[key] (besides header["kv"]), with how
+# their value is read
+_HEADER_VALUES: Dict[str, Callable[[str], Any]] = {
+    "fields": _split_fields,
+    "units": _split_units,
+    "missing": str,
+    "delimiter": str.lower,
+}
+
+
 def _normalize_delimiter(token: Optional[str]) -> Optional[str]:
     if not token:
         return None
@@ -88,33 +149,120 @@ def _detect_delimiter(sample_line: str) -> str:
     return " "
 
 
-def _is_missing(value_str: str, missing_token: Optional[str]) -> bool:
+# nan in any letter case
+_NAN_SPELLINGS = frozenset("".join(c) for c in itertools.product("nN", "aA", "nN"))
+
+
+def _missing_tokens(missing_token: Optional[str]) -> FrozenSet[str]:
+    """
+    Cell strings that mean "missing": empty, nan, and the /missing= value.
+    """
+    tokens = {"", *_NAN_SPELLINGS}
+    if missing_token is not None:
+        tokens.add(str(missing_token).strip())
+    return frozenset(tokens)
+
+
+def _to_number_or_string(value_str: str, missing: FrozenSet[str]) -> Optional[Any]:
+    """
+    Convert to float if numeric, else keep string. Return None if missing
+    (missing is the set from _missing_tokens).
+
+    Signed NaN spellings (+nan, -nan) are not missing tokens; they stay
+    strings, so the output writer echoes them as written.
+    """
     s = value_str.strip()
-    if s == "":
-        return True
-    if s.lower() == "nan":
-        return True
-    if missing_token is None:
-        return False
-    return s == str(missing_token).strip()
+    if s in missing:
+        return None
+    try:
+        value = float(s)
+    except ValueError:
+        return s
+    return s if value != value else value
+
+
+# ASCII characters str.strip() removes (besides \n, which ends a line)
+_ASCII_PADDING = " \t\r\x0b\x0c\x1c\x1d\x1e\x1f"
+
+
+def _may_need_strip(text: str) -> bool:
+    """
+    True unless text certainly has no character str.strip() would remove
+    (checked with a few substring scans instead of a strip per cell).
+    """
+    return not text.isascii() or any(c in text for c in _ASCII_PADDING)
 
 
-_float_re = re.compile(r"^[+-]?(\d+(\.\d*)?|\.\d+)([eE][+-]?\d+)?$")
+def _split_data_lines(data_lines: List[str], delimiter: str) -> List[List[str]]:
+    if delimiter == " ":
+        return [line.split() for line in data_lines]  # any whitespace
+    if not _may_need_strip("\n".join(data_lines)):
+        # Nothing to strip around the cells (the usual comma/tab file)
+        return [line.split(delimiter) for line in data_lines]
+    return [[p.strip() for p in line.split(delimiter)] for line in data_lines]
 
 
-def _to_number_or_string(value_str: str, missing_token: Optional[str]) -> Optional[Any]:
+def _fit_row(parts: List[str], n_fields: int) -> List[Optional[str]]:
     """
-    Convert to float if numeric, else keep string. Return None if missing.
+    Truncate or None-pad a split data row to one cell per field.
     """
-    if _is_missing(value_str, missing_token):
+    if len(parts) > n_fields:
+        return parts[:n_fields]
+    return parts + [None] * (n_fields - len(parts))
+
+
+def _cell_value(value_str: Optional[str], missing: FrozenSet[str]) -> Optional[Any]:
+    if value_str is None:
         return None
-    s = value_str.strip()
-    if _float_re.match(s):
-        try:
-            return float(s)
-        except Exception:
-            return s
-    return s
+    return _to_number_or_string(value_str, missing)
+
+
+def _convert_column(
+    cells: Tuple[Optional[str], ...], missing: FrozenSet[str]
+) -> List[Optional[Any]]:
+    """
+    Apply _to_number_or_string to a whole data column.
+
+    All-numeric columns (the usual case) go through one NumPy string to
+    float conversion, which parses exactly like float(); NaN cells (nan,
+    absent) and missing-token cells are then redone one by one. Other
+    columns are converted once per distinct cell value, so a repeated
+    string (station, cruise, bottle) is one shared str object rather
+    than one per row.
+    """
+    try:
+        values = np.array(cells, dtype=np.float64)
+    except ValueError:
+        values = None
+    if values is not None:
+        redo = np.isnan(values)
+        for token in missing:
+            try:
+                redo |= values == float(token)
+            except ValueError:
+                pass
+        out = values.tolist()
+        for i in np.flatnonzero(redo).tolist():
+            out[i] = _cell_value(cells[i], missing)
+        return out
+
+    converted = {s: _cell_value(s, missing) for s in set(cells)}
+    return [converted[s] for s in cells]
+
+
+_UTC = timezone.utc
+
+
+def _float_column(values: Sequence[Optional[Any]]) -> np.ndarray:
+    """
+    float64 array of converted cell values, NaN for None and strings.
+    """
+    try:
+        return np.array(values, dtype=np.float64)  # floats and None (NaN)
+    except ValueError:
+        # Strings never parse here: _to_number_or_string kept them
+        # because float() failed on them
+        return np.array([v if isinstance(v, float) else np.nan for v in values], dtype=np.float64)
 
 
 def _parse_date(date_str: str) -> Optional[datetime]:
@@ -125,20 +273,15 @@ def _parse_date(date_str: str) -> Optional[datetime]:
     Returns a date with tzinfo=UTC and time=00:00:00 (caller adds time).
     """
     s = date_str.strip()
-    if not s:
-        return None
+    n = len(s)
 
     # yyyymmdd
-    if re.fullmatch(r"\d{8}", s):
-        y = int(s[0:4])
-        m = int(s[4:6])
-        d = int(s[6:8])
-        return datetime(y, m, d, tzinfo=timezone.utc)
+    if n == 8 and s.isdecimal():
+        return datetime(int(s[0:4]), int(s[4:6]), int(s[6:8]), tzinfo=_UTC)
 
     # yyyy-mm-dd
-    if re.fullmatch(r"\d{4}-\d{2}-\d{2}", s):
-        y, m, d = s.split("-")
-        return datetime(int(y), int(m), int(d), tzinfo=timezone.utc)
+    if n == 10 and s[4] == s[7] == "-" and (s[0:4] + s[5:7] + s[8:10]).isdecimal():
+        return datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]), tzinfo=_UTC)
 
     return None
 
@@ -153,60 +296,104 @@ def _parse_time(time_str: str) -> Optional[Tuple[int, int, int]]:
     Returns (H, M, S)
     """
     s = time_str.strip()
-    if not s:
-        return None
+    n = len(s)
 
-    if re.fullmatch(r"\d{2}:\d{2}:\d{2}", s):
-        h, m, sec = s.split(":")
-        return int(h), int(m), int(sec)
+    if n == 8 and s[2] == s[5] == ":" and (s[0:2] + s[3:5] + s[6:8]).isdecimal():
+        return int(s[0:2]), int(s[3:5]), int(s[6:8])
 
-    if re.fullmatch(r"\d{6}", s):
+    if n == 6 and s.isdecimal():
         return int(s[0:2]), int(s[2:4]), int(s[4:6])
 
-    if re.fullmatch(r"\d{2}:\d{2}", s):
-        h, m = s.split(":")
-        return int(h), int(m), 0
+    if n == 5 and s[2] == ":" and (s[0:2] + s[3:5]).isdecimal():
+        return int(s[0:2]), int(s[3:5]), 0
 
-    if re.fullmatch(r"\d{4}", s):
+    if n == 4 and s.isdecimal():
         return int(s[0:2]), int(s[2:4]), 0
 
     return None
 
 
-def _parse_datetime(dt_str: str) -> Optional[datetime]:
+_DATETIME_FORMATS = ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S")
+
+
+def _parse_datetime(dt_str: str, formats: Optional[List[str]] = None) -> Optional[datetime]:
     """
     Handles a few common datetime formats:
       YYYY-MM-DDTHH:MM:SSZ
       YYYY-MM-DD HH:MM:SS
       YYYY-MM-DDTHH:MM:SS (assume UTC)
+
+    formats, if given, is a per-file list of the strptime formats; the one
+    that matches is moved to its front, so the rest of a file's cells
+    try it first. (The formats never both match, so order does not change
+    the result.)
     """
     s = dt_str.strip()
     if not s:
         return None
 
     # Normalize trailing Z
-    if s.endswith("Z"):
-        s2 = s[:-1]
-        for fmt in ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S"):
-            try:
-                return datetime.strptime(s2, fmt).replace(tzinfo=timezone.utc)
-            except Exception:
-                pass
+    s2 = s[:-1] if s.endswith("Z") else s
+
+    # The fixed-width form (nearly every file) is sliced directly
+    if (
+        len(s2) == 19
+        and s2.isascii()
+        and s2[4] == s2[7] == "-"
+        and s2[10] in "T "
+        and s2[13] == s2[16] == ":"
+        and (s2[0:4] + s2[5:7] + s2[8:10] + s2[11:13] + s2[14:16] + s2[17:19]).isdecimal()
+    ):
+        try:
+            return datetime(
+                int(s2[0:4]), int(s2[5:7]), int(s2[8:10]),
+                int(s2[11:13]), int(s2[14:16]), int(s2[17:19]),
+                tzinfo=_UTC,
+            )
+        except ValueError:
+            return None
 
-    for fmt in ("%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S"):
+    # strptime also takes single-digit fields and other separators
+    for n, fmt in enumerate(_DATETIME_FORMATS if formats is None else formats):
         try:
-            return datetime.strptime(s, fmt).replace(tzinfo=timezone.utc)
+            dt = datetime.strptime(s2, fmt).replace(tzinfo=_UTC)
         except Exception:
-            pass
+            continue
+        if n and formats is not None:
+            formats.insert(0, formats.pop(n))
+        return dt
 
     return None
 
 
+def _epoch_seconds(dt: Optional[datetime]) -> float:
+    try:
+        return dt.timestamp()
+    except Exception:
+        return float("nan")
+
+
+def _seconds_of_day(time_part: Optional[Tuple[int, int, int]]) -> float:
+    if time_part is None:
+        return float("nan")
+    h, m, s = time_part
+    return float(h * 3600 + m * 60 + s)
+
+
+def _lookup_column(
+    cells: Tuple[Optional[str], ...], table: Dict[Optional[str], float]
+) -> np.ndarray:
+    """
+    float64 array of table[cell] for a data column (table: per distinct cell).
+    """
+    return np.fromiter(map(table.__getitem__, cells), dtype=np.float64, count=len(cells))
+
+
 def _combine_date_time(date_part: Optional[datetime], time_part: Optional[Tuple[int, int, int]]) -> Optional[datetime]:
     if date_part is None or time_part is None:
         return None
     h, m, s = time_part
-    return datetime(date_part.year, date_part.month, date_part.day, h, m, s, tzinfo=timezone.utc)
+    return datetime(date_part.year, date_part.month, date_part.day, h, m, s, tzinfo=_UTC)
 
 
 # -----------------------------
@@ -226,19 +413,17 @@ def parse_seabass_file(path: str) -> SeaBASSData:
 
     Everything else is preserved in SeaBASSRecord.variables.
     """
-    with open(path, "r", encoding="utf-8", errors="replace") as f:
-        raw_lines = [_strip_bom(ln.rstrip("\n")) for ln in f]
+    raw_lines = _read_lines(path)
 
     header: Dict[str, Any] = {"raw_header_lines": []}
-    data_lines: List[str] = []
 
     in_header = False
-    header_done = False
+    data_start = len(raw_lines)
 
     # Collect all kv pairs too (useful later)
     header_kv: Dict[str, str] = {}
 
-    for line in raw_lines:
+    for n, line in enumerate(raw_lines):
         s = line.strip()
 
         if not in_header:
@@ -247,35 +432,26 @@ def parse_seabass_file(path: str) -> SeaBASSData:
                 header["raw_header_lines"].append(line)
             continue
 
-        if in_header and not header_done:
-            header["raw_header_lines"].append(line)
-
-            if s.lower() == "/end_header":
-                header_done = True
-                continue
-
-            kv = _parse_kv_line(line)
-            if kv is None:
-                continue
-            key, val = kv
-            header_kv[key] = val
+        header["raw_header_lines"].append(line)
 
-            if key == "fields":
-                header["fields"] = [v.strip() for v in val.split(",") if v.strip()]
-            elif key == "units":
-                header["units"] = [v.strip() for v in val.split(",")]
-            elif key == "missing":
-                header["missing"] = val
-            elif key == "delimiter":
-                header["delimiter"] = val.lower()
+        if s.lower() == "/end_header":
+            data_start = n + 1
+            break
 
+        kv = _parse_kv_line(line)
+        if kv is None:
             continue
+        key, val = kv
+        header_kv[key] = val
 
-        # After header
-        if header_done:
-            if not s or s.startswith("!"):
-                continue
-            data_lines.append(line)
+        read_value = _HEADER_VALUES.get(key)
+        if read_value is not None:
+            header[key] = read_value(val)
+
+    # After header: every non-blank, non-comment line is data
+    data_lines = [
+        line for line in raw_lines[data_start:] if (s := line.strip()) and not s.startswith("!")
+    ]
 
     header["kv"] = header_kv
 
@@ -293,18 +469,12 @@ def parse_seabass_file(path: str) -> SeaBASSData:
             raise ValueError("SeaBASS file has no data lines after /end_header")
         delimiter = _detect_delimiter(data_lines[0])
 
-    missing_token = header.get("missing")
+    missing = _missing_tokens(header.get("missing"))
 
     # Build field index map (case-insensitive)
     fields_lc = [f.strip() for f in fields]
     idx: Dict[str, int] = {name.lower(): i for i, name in enumerate(fields_lc)}
 
-    def get_field(row: List[str], key: str) -> Optional[str]:
-        i = idx.get(key.lower())
-        if i is None or i >= len(row):
-            return None
-        return row[i]
-
     # Identify how to parse time for each row
     has_datetime = "datetime" in idx
     has_date = "date" in idx
@@ -314,84 +484,144 @@ def parse_seabass_file(path: str) -> SeaBASSData:
     header_date = _parse_date(header_kv.get("start_date", "")) or _parse_date(header_kv.get("date", ""))
     header_time = _parse_time(header_kv.get("start_time", "")) or _parse_time(header_kv.get("time", ""))
 
-    records: List[SeaBASSRecord] = []
-
-    # Prepare data splitting
-    for line in data_lines:
-        if delimiter == " ":
-            parts = line.split()  # any whitespace
-        else:
-            parts = [p.strip() for p in line.split(delimiter)]
-
-        if len(parts) < 2:
-            continue
-
-        # lat/lon are required for matchup
-        lat_s = get_field(parts, "lat")
-        lon_s = get_field(parts, "lon")
-        if lat_s is None or lon_s is None:
-            # Some files use "latitude"/"longitude" but your example uses lat/lon.
-            lat_s = lat_s or get_field(parts, "latitude")
-            lon_s = lon_s or get_field(parts, "longitude")
-
-        if lat_s is None or lon_s is None:
-            # Skip rows without coordinates
-            continue
-
-        lat_v = _to_number_or_string(lat_s, missing_token)
-        lon_v = _to_number_or_string(lon_s, missing_token)
-        if lat_v is None or lon_v is None:
-            continue
-        try:
-            lat = float(lat_v)
-            lon = float(lon_v)
-        except Exception:
-            continue
-
-        # Depth (optional)
-        depth = None
-        depth_s = get_field(parts, "depth") or get_field(parts, "z")
-        if depth_s is not None:
-            d = _to_number_or_string(depth_s, missing_token)
-            if isinstance(d, (int, float)):
-                depth = float(d)
-
-        # Datetime
-        dt: Optional[datetime] = None
-        if has_datetime:
-            dt = _parse_datetime(get_field(parts, "datetime") or "")
-        if dt is None and has_date and has_time:
-            d0 = _parse_date(get_field(parts, "date") or "")
-            t0 = _parse_time(get_field(parts, "time") or "")
-            dt = _combine_date_time(d0, t0)
-        if dt is None and header_date and header_time:
-            dt = _combine_date_time(header_date, header_time)
-
-        if dt is None:
-            # Skip rows we cannot time-locate
-            continue
-
-        # Variables: keep everything else (including strings like station/bottle)
-        variables: Dict[str, Any] = {}
-        for name, i in idx.items():
-            # Use original field name case from header for output keys
-            field_name = fields_lc[i]
-            if i >= len(parts):
-                variables[field_name] = None
-                continue
-            raw = parts[i]
-            variables[field_name] = _to_number_or_string(raw, missing_token)
-
-        # Ensure we don’t duplicate core attributes needlessly
-        # (But leaving them in variables is okay; engine uses rec.lat/lon/time anyway)
-        records.append(
-            SeaBASSRecord(
-                lat=lat,
-                lon=lon,
-                time=dt,
-                depth=depth,
-                variables=variables,
-            )
+    # Split the data section, then convert it a column at a time; rows
+    # shorter than /fields are padded with None (absent cells).
+    n_fields = len(fields_lc)
+    rows = _split_data_lines(data_lines, delimiter)
+    if n_fields < 2 or set(map(len, rows)) - {n_fields}:
+        # Only files with ragged rows pay for the per-row length checks
+        rows = [
+            parts if len(parts) == n_fields else _fit_row(parts, n_fields)
+            for parts in rows
+            if len(parts) >= 2
+        ]
+    if not rows:
+        return SeaBASSData(header=header, records=[])
+    raw_cols = list(zip(*rows))
+    absent = (None,) * len(rows)
+    # Converted on first use: date/time columns are only needed raw
+    cols: Dict[int, List[Optional[Any]]] = {}
+
+    def values_at(i: int) -> List[Optional[Any]]:
+        if i not in cols:
+            cols[i] = _convert_column(raw_cols[i], missing)
+        return cols[i]
+
+    def raw_column(key: str) -> Tuple[Optional[str], ...]:
+        i = idx.get(key)
+        return absent if i is None else raw_cols[i]
+
+    def value_column(key: str) -> List[Optional[Any]]:
+        i = idx.get(key)
+        return absent if i is None else values_at(i)
+
+    # Coordinate and depth columns are resolved once, so the row loop
+    # below only indexes them
+    lat_col, lon_col = value_column("lat"), value_column("lon")
+    if "latitude" in idx or "longitude" in idx:
+        # Some files use "latitude"/"longitude": taken for rows where
+        # lat or lon is absent (an empty lat/lon cell is replaced too)
+        lat_raw, lon_raw = raw_column("lat"), raw_column("lon")
+        latitude_vals, longitude_vals = value_column("latitude"), value_column("longitude")
+        lat_col, lon_col = list(lat_col), list(lon_col)
+        for k in range(len(rows)):
+            if lat_raw[k] is None or lon_raw[k] is None:
+                if not lat_raw[k]:
+                    lat_col[k] = latitude_vals[k]
+                if not lon_raw[k]:
+                    lon_col[k] = longitude_vals[k]
+    depth_col = value_column("depth")
+    if "z" in idx:
+        # z where depth is absent or empty
+        depth_col = [
+            d if raw else z
+            for d, raw, z in zip(depth_col, raw_column("depth"), values_at(idx["z"]))
+        ]
+    datetime_raw = raw_column("datetime")
+    date_raw, time_raw = raw_column("date"), raw_column("time")
+
+    # Variables: keep everything else (including strings like station/bottle),
+    # keyed by the original field name case from the header. A repeated
+    # field name keeps its last column.
+    var_cols = [i for name, i in idx.items() if name not in _RECORD_ATTRIBUTE_FIELDS]
+    var_names = [fields_lc[i] for i in var_cols]
+    if var_cols:
+        var_rows = zip(*(values_at(i) for i in var_cols))
+    else:
+        var_rows = itertools.repeat((), len(rows))
+
+    # Date and time cells repeat a lot (one cast, one day); parse each
+    # distinct cell once
+    formats = list(_DATETIME_FORMATS)
+    datetimes = (
+        {s: _parse_datetime(s or "", formats) for s in set(datetime_raw)} if has_datetime else {}
+    )
+    has_date_time = has_date and has_time
+    dates = {s: _parse_date(s or "") for s in set(date_raw)} if has_date_time else {}
+    times = {s: _parse_time(s or "") for s in set(time_raw)} if has_date_time else {}
+    header_dt = (
+        _combine_date_time(header_date, header_time) if header_date and header_time else None
+    )
+
+    # Row times as epoch seconds, assembled a column at a time from those
+    # parses with the same precedence as dt below (NaN: no time)
+    row_epoch = np.full(len(rows), np.nan)
+    if has_datetime:
+        row_epoch = _lookup_column(
+            datetime_raw, {s: _epoch_seconds(v) for s, v in datetimes.items()}
         )
-
-    return SeaBASSData(header=header, records=records)
+    if has_date_time:
+        day_sec = _lookup_column(date_raw, {s: _epoch_seconds(v) for s, v in dates.items()})
+        time_sec = _lookup_column(time_raw, {s: _seconds_of_day(v) for s, v in times.items()})
+        np.copyto(row_epoch, day_sec + time_sec, where=np.isnan(row_epoch))
+    if header_dt is not None:
+        row_epoch[np.isnan(row_epoch)] = header_dt.timestamp()
+
+    # The per-row work is specialised once per file: cells are already
+    # typed (float, str or None), so a row has coordinates exactly when its
+    # lat and lon cells are floats, and the time lookup is picked for the
+    # columns this file actually has instead of being re-decided per row.
+    located = [
+        k for k, lat, lon in zip(range(len(rows)), lat_col, lon_col)
+        if type(lat) is float and type(lon) is float
+    ]
+    if has_datetime and has_date_time:
+        stamps = [
+            datetimes[datetime_raw[k]]
+            or _combine_date_time(dates[date_raw[k]], times[time_raw[k]])
+            for k in located
+        ]
+    elif has_datetime:
+        stamps = [datetimes[datetime_raw[k]] for k in located]
+    elif has_date_time:
+        stamps = [_combine_date_time(dates[date_raw[k]], times[time_raw[k]]) for k in located]
+    else:
+        stamps = [None] * len(located)
+    if header_dt is not None:
+        stamps = [header_dt if dt is None else dt for dt in stamps]
+
+    # Rows we cannot time-locate are skipped
+    kept = [k for k, dt in zip(located, stamps) if dt is not None]
+    var_values = list(var_rows)
+    records: List[SeaBASSRecord] = [
+        SeaBASSRecord(
+            lat_col[k],
+            lon_col[k],
+            dt,
+            depth_col[k] if type(depth_col[k]) is float else None,
+            dict(zip(var_names, var_values[k])),
+        )
+        for k, dt in zip(located, stamps)
+        if dt is not None
+    ]
+
+    # The per-record columns are gathered from whole data columns rather
+    # than appended to per kept row
+    kept_rows = np.array(kept, dtype=np.intp)
+    return SeaBASSData(
+        header=header,
+        records=records,
+        lat=_float_column(lat_col)[kept_rows],
+        lon=_float_column(lon_col)[kept_rows],
+        epoch_sec=row_epoch[kept_rows],
+    )
@@ -12,12 +12,16 @@ Usage example (from terminal or PyCharm parameters):
         --max-distance-km 5 \
         --max-time-sec 10800 \
         --mode window
+
+Several pairs can be given at once (--seabass a.sb b.sb --l2 a.nc b.nc
+--out a_out.sb b_out.sb); they are processed in parallel worker
+processes, --workers of them (default: one per CPU).
 """
 
 import argparse
 from typing import List
 
-from matchup.orchestrator import append_satellite_to_seabass
+from matchup.orchestrator import append_satellite_to_seabass_many
 
 
 def parse_args() -> argparse.Namespace:
@@ -27,18 +31,21 @@ def parse_args() -> argparse.Namespace:
 
     parser.add_argument(
         "--seabass",
+        nargs="+",
         required=True,
-        help="Path to input SeaBASS file (.sb).",
+        help="Path(s) to input SeaBASS file(s) (.sb), one per pair.",
     )
     parser.add_argument(
         "--l2",
+        nargs="+",
         required=True,
-        help="Path to input OB.DAAC L2 file (NetCDF-4).",
+        help="Path(s) to input OB.DAAC L2 file(s) (NetCDF-4), one per pair.",
     )
     parser.add_argument(
         "--out",
+        nargs="+",
         required=True,
-        help="Path to output augmented SeaBASS file.",
+        help="Path(s) to output augmented SeaBASS file(s), one per pair.",
     )
 
     parser.add_argument(
@@ -70,8 +77,17 @@ def parse_args() -> argparse.Namespace:
         default="window",
         help="Matchup mode: 'window' (aggregate) or 'nearest' (single pixel).",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Worker processes when several pairs are given (default: CPU count).",
+    )
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if not len(args.seabass) == len(args.l2) == len(args.out):
+        parser.error("--seabass, --l2 and --out need the same number of paths")
+    return args
 
 
 def main() -> None:
@@ -100,14 +116,15 @@ def main() -> None:
     print(f"  bad_flag_mask   : {args.bad_flag_mask}")
     print(f"  mode            : {args.mode}")
 
-    output_path = append_satellite_to_seabass(
-        seabass_path=args.seabass,
-        l2_path=args.l2,
+    output_paths = append_satellite_to_seabass_many(
+        jobs=list(zip(args.seabass, args.l2, args.out)),
         params=params,
-        output_path=args.out,
+        max_workers=args.workers,
     )
 
-    print(f"\n✅ Matchup complete. Output written to:\n  {output_path}")
+    print("\n✅ Matchup complete. Output written to:")
+    for output_path in output_paths:
+        print(f"  {output_path}")
 
 
 if __name__ == "__main__":
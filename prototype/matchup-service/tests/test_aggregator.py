@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from matchup.aggregator import aggregate_values
+
+
+@pytest.mark.parametrize("values", [
+    [3.0],
+    [1.0, 2.0],
+    [5.0, 1.0, 4.0, 2.0, 3.0],
+    [26.7, 26.75, np.nan, 26.9, 26.1, 26.75],
+    list(np.random.default_rng(0).normal(26.0, 0.2, 81)),
+])
+def test_matches_numpy_reductions(values):
+    v = np.asarray(values, dtype=float)
+    v = v[np.isfinite(v)]
+
+    stats = aggregate_values(values)
+
+    assert stats["count"] == v.size
+    assert stats["median"] == np.median(v)
+    assert stats["mean"] == pytest.approx(np.mean(v), rel=1e-12)
+    expected_std = np.std(v, ddof=1) if v.size > 1 else 0.0
+    assert stats["std"] == pytest.approx(expected_std, rel=1e-9, abs=1e-12)
+
+
+@pytest.mark.parametrize("values", [[], [np.nan, np.inf]])
+def test_no_finite_values(values):
+    assert aggregate_values(values) == {"mean": None, "median": None, "std": None, "count": 0}
+
+
+def test_input_is_not_modified():
+    values = np.array([5.0, 1.0, 4.0, 2.0])
+    aggregate_values(values)
+    np.testing.assert_array_equal(values, [5.0, 1.0, 4.0, 2.0])
+
+
+def test_empty_result_is_not_shared():
+    stats = aggregate_values([])
+    stats["count"] = 99
+    assert aggregate_values(np.array([]))["count"] == 0
@@ -0,0 +1,132 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from matchup._kernels import haversine_km_flat
+from matchup.filters import (
+    _haversine_distance_km_numpy,
+    build_flag_mask,
+    build_spatial_mask,
+    build_valid_pixel_mask,
+    find_nearest_valid_pixel,
+    haversine_distance_km,
+)
+from matchup.l2_loader import L2Grid
+from matchup.seabass_parser import SeaBASSRecord
+
+
+T0 = datetime(2024, 5, 20, 19, 15, 1, tzinfo=timezone.utc)
+
+
+def _make_grid(nlines=60, ncols=40, with_time=False, with_flags=False):
+    lat, lon = np.meshgrid(
+        np.linspace(29.0, 30.0, nlines), np.linspace(-88.0, -87.0, ncols), indexing="ij"
+    )
+    flags = None
+    if with_flags:
+        flags = (np.arange(lat.size, dtype=np.uint32) % 4).reshape(lat.shape)
+    time = None
+    if with_time:
+        time = np.linspace(T0.timestamp() - 3600, T0.timestamp() + 3600, nlines)
+    return L2Grid(
+        lat=lat.astype(np.float32),
+        lon=lon.astype(np.float32),
+        variables={},
+        flags=flags,
+        time=time,
+    )
+
+
+def _record(lat, lon, when=T0):
+    return SeaBASSRecord(lat=lat, lon=lon, time=when, depth=None, variables={})
+
+
+def test_haversine_kernel_matches_numpy():
+    l2 = _make_grid()
+    lat = l2.lat.astype(np.float64)
+    lon = l2.lon.astype(np.float64)
+    lat[3, 4] = np.nan
+    expected = _haversine_distance_km_numpy(29.4, -87.3, lat, lon)
+
+    out = np.empty(lat.size)
+    haversine_km_flat(29.4, -87.3, lat.reshape(-1), lon.reshape(-1), 6371.0, out)
+    np.testing.assert_allclose(out.reshape(lat.shape), expected, rtol=1e-10, equal_nan=True)
+    np.testing.assert_allclose(
+        haversine_distance_km(29.4, -87.3, lat, lon), expected, rtol=1e-10, equal_nan=True
+    )
+
+
+@pytest.mark.parametrize("lat0,lon0,max_distance_km", [
+    (29.5, -87.5, 5.0),
+    (29.5, -87.5, 60.0),
+    (78.0, 179.9, 40.0),
+    (-89.9, 10.0, 30.0),
+    (0.0, -179.95, 25.0),
+])
+def test_spatial_mask_matches_full_haversine(lat0, lon0, max_distance_km):
+    lat, lon = np.meshgrid(
+        np.linspace(lat0 - 1.0, lat0 + 1.0, 81), np.linspace(lon0 - 3.0, lon0 + 3.0, 121),
+        indexing="ij",
+    )
+    lat = np.clip(lat, -90.0, 90.0)
+    lon = (lon + 180.0) % 360.0 - 180.0
+    l2 = L2Grid(lat=lat, lon=lon, variables={}, flags=None, time=None)
+
+    expected = _haversine_distance_km_numpy(lat0, lon0, lat, lon) <= max_distance_km
+    assert expected.any()
+    np.testing.assert_array_equal(build_spatial_mask(l2, lat0, lon0, max_distance_km), expected)
+
+
+def _brute_force_nearest(l2, rec, max_distance_km, max_time_diff_sec, bad_flag_mask):
+    mask = build_valid_pixel_mask(l2, rec, max_distance_km, max_time_diff_sec, bad_flag_mask)
+    if not mask.any():
+        return None
+    rows, cols = np.where(mask)
+    d = haversine_distance_km(rec.lat, rec.lon, l2.lat[rows, cols], l2.lon[rows, cols])
+    i = int(np.argmin(d))
+    return int(rows[i]), int(cols[i])
+
+
+@pytest.mark.parametrize("max_distance_km,max_time_diff_sec,bad_flag_mask", [
+    (5.0, None, None),
+    (5.0, 1800.0, None),
+    (5.0, None, 3),
+    (1.0, 600.0, 1),
+    (None, 1800.0, 2),
+])
+def test_nearest_matches_brute_force(max_distance_km, max_time_diff_sec, bad_flag_mask):
+    l2 = _make_grid(with_time=True, with_flags=True)
+    for lat, lon in [(29.5, -87.5), (29.01, -87.99), (30.2, -87.5), (29.73, -87.21)]:
+        rec = _record(lat, lon)
+        expected = _brute_force_nearest(l2, rec, max_distance_km, max_time_diff_sec, bad_flag_mask)
+        assert find_nearest_valid_pixel(
+            l2, rec, max_distance_km, max_time_diff_sec, bad_flag_mask
+        ) == expected
+
+
+def test_nearest_outside_radius_is_none():
+    l2 = _make_grid()
+    assert find_nearest_valid_pixel(l2, _record(35.0, -87.5), 5.0, None, None) is None
+
+
+def test_nearest_skips_non_finite_pixels():
+    l2 = _make_grid()
+    l2.lat[30, 20] = np.nan
+    rec = _record(float(l2.lat[30, 19]), float(l2.lon[30, 20]))
+    assert find_nearest_valid_pixel(l2, rec, 5.0, None, None) != (30, 20)
+
+
+def test_flag_mask_is_cached_per_bad_flag_mask():
+    l2 = _make_grid(with_flags=True)
+    first = build_flag_mask(l2, 3)
+    np.testing.assert_array_equal(first, (l2.flags & 3) == 0)
+
+    # Callers may modify what they get back without touching the cache.
+    first[:] = False
+    np.testing.assert_array_equal(build_flag_mask(l2, 3), (l2.flags & 3) == 0)
+    np.testing.assert_array_equal(build_flag_mask(l2, 1), (l2.flags & 1) == 0)
+
+    # Replacing the flags array invalidates the cached mask.
+    l2.flags = np.zeros_like(l2.flags)
+    assert build_flag_mask(l2, 3).all()
@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+
+import numpy as np
+from netCDF4 import Dataset, default_fillvals
+
+from matchup.l2_loader import load_l2_file, parse_granule_datetime_from_filename
+
+
+def test_parse_granule_datetime_from_filename():
+    dt = parse_granule_datetime_from_filename(
+        "/data/AQUA_MODIS.20240520T191501.L2.SST.nc"
+    )
+    assert dt == datetime(2024, 5, 20, 19, 15, 1, tzinfo=timezone.utc)
+
+
+def test_parse_granule_datetime_without_timestamp():
+    assert parse_granule_datetime_from_filename("granule.nc") is None
+
+
+def _write_granule(path):
+    with Dataset(path, "w") as ds:
+        ds.createDimension("lines", 1)
+        ds.createDimension("pixels", 4)
+        nav = ds.createGroup("navigation_data")
+        geo = ds.createGroup("geophysical_data")
+        for name, values in (("latitude", [30.0] * 4), ("longitude", [-80.0] * 4)):
+            var = nav.createVariable(name, "f4", ("lines", "pixels"))
+            var[:] = np.array([values], dtype=np.float32)
+
+        sst = geo.createVariable(
+            "sst", "i2", ("lines", "pixels"), fill_value=np.int16(-32767)
+        )
+        sst.scale_factor = np.float32(0.005)
+        sst.add_offset = np.float32(0.0)
+        sst.valid_min = np.int16(-1000)
+        sst.valid_max = np.int16(10000)
+        sst.set_auto_maskandscale(False)
+        sst[:] = np.array([[2000, -32767, -1777, 12000]], dtype=np.int16)
+
+        # No _FillValue: netCDF's default fill for the type is masked
+        chl = geo.createVariable("chl", "f4", ("lines", "pixels"))
+        chl.set_auto_maskandscale(False)
+        chl[:] = np.array([[1.0, default_fillvals["f4"], 2.0, 3.0]], dtype=np.float32)
+
+        # A two-element valid_range takes precedence over valid_min
+        kd = geo.createVariable("kd", "i2", ("lines", "pixels"))
+        kd.valid_range = np.array([0, 10], dtype=np.int16)
+        kd.valid_min = np.int16(2)
+        kd.set_auto_maskandscale(False)
+        kd[:] = np.array([[1, 11, 5, default_fillvals["i2"]]], dtype=np.int16)
+
+        # _Unsigned shorts: fill and limits are unsigned too
+        rrs = geo.createVariable("rrs", "i2", ("lines", "pixels"), fill_value=np.int16(-1))
+        rrs._Unsigned = "true"
+        rrs.scale_factor = np.float32(0.5)
+        rrs.valid_max = np.int16(-2)
+        rrs.set_auto_maskandscale(False)
+        rrs[:] = np.array([[-32768, 100, -1, 10]], dtype=np.int16)
+
+        flags = geo.createVariable("l2_flags", "i4", ("lines", "pixels"))
+        flags[:] = np.array([[0, 1, 2, -2147483648]], dtype=np.int32)
+
+
+def test_load_l2_file_masks_fill_and_out_of_range(tmp_path):
+    path = tmp_path / "AQUA_MODIS.20240520T191501.L2.SST.nc"
+    _write_granule(str(path))
+
+    l2 = load_l2_file(str(path), ["sst", "chl", "kd", "rrs"])
+
+    sst = l2.variables["sst"]
+    assert np.issubdtype(sst.dtype, np.floating)
+    assert sst[0, 0] == np.float32(2000) * np.float32(0.005)
+    assert np.isnan(sst[0, 1:]).all()
+    np.testing.assert_array_equal(l2.variables["chl"], [[1.0, np.nan, 2.0, 3.0]])
+    np.testing.assert_array_equal(l2.variables["kd"], [[1.0, np.nan, 5.0, np.nan]])
+    np.testing.assert_array_equal(l2.variables["rrs"], [[16384.0, 50.0, np.nan, 5.0]])
+    assert l2.flags.dtype == np.uint32
+    assert l2.flags.tolist() == [[0, 1, 2, 0x80000000]]
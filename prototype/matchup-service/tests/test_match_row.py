@@ -0,0 +1,251 @@
+import dataclasses
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from matchup._kernels import NUMBA_AVAILABLE, segment_stats
+from matchup.l2_loader import L2Grid
+from matchup.match_row import (
+    _clear_bad_flags,
+    _segment_stats_numpy,
+    _row_to_dict,
+    _subset_nearest_indices,
+    _subset_window_indices,
+    _window_indices_batch,
+    _window_indices_bbox,
+    _window_indices_compiled,
+    _window_indices_tree,
+    haversine_km,
+    match_record_to_l2,
+    match_records_to_l2,
+    record_coordinates,
+    record_epoch_seconds,
+)
+from matchup.seabass_parser import SeaBASSRecord
+
+
+T0 = datetime(2024, 5, 20, 19, 15, 1, tzinfo=timezone.utc)
+
+
+def _make_grid(nlines=50, ncols=30):
+    lat, lon = np.meshgrid(
+        np.linspace(29.0, 29.5, nlines), np.linspace(-88.0, -87.5, ncols), indexing="ij"
+    )
+    rng = np.random.default_rng(0)
+    chl = rng.lognormal(size=lat.shape).astype(np.float32)
+    chl[::7, ::5] = np.nan
+    return L2Grid(
+        lat=lat.astype(np.float32),
+        lon=lon.astype(np.float32),
+        variables={"chlor_a": chl},
+        flags=(np.arange(lat.size, dtype=np.uint32) % 4).reshape(lat.shape),
+        time=None,
+        granule_datetime_utc=T0,
+    )
+
+
+def _records():
+    return [
+        SeaBASSRecord(lat=lat, lon=lon, time=T0, depth=None, variables={})
+        for lat, lon in [(29.2, -87.7), (29.25, -87.71), (28.0, -87.7), (29.49, -87.51)]
+    ]
+
+
+@pytest.mark.parametrize("mode", ["window", "nearest"])
+@pytest.mark.parametrize("bad_flag_mask", [None, 1])
+def test_batched_matches_per_record(mode, bad_flag_mask):
+    l2 = _make_grid()
+    records = _records()
+    kwargs = dict(
+        variable_names=["chlor_a", "missing_var"],
+        max_distance_km=5.0,
+        max_time_diff_sec=3 * 3600,
+        bad_flag_mask=bad_flag_mask,
+        mode=mode,
+    )
+    expected = [match_record_to_l2(rec, l2, **kwargs) for rec in records]
+    batched = match_records_to_l2(records, l2, **kwargs)
+    assert [_row_to_dict(row) for row in batched] == expected
+
+
+def test_window_outside_swath_has_no_pixels():
+    l2 = _make_grid()
+    result = match_record_to_l2(
+        _records()[2], l2, ["chlor_a"], max_distance_km=5.0, max_time_diff_sec=3600
+    )
+    assert result["matchup_min_distance_km"] is None
+    assert result["sat_chlor_a_n"] == 0
+    assert result["sat_chlor_a_mean"] is None
+
+
+def test_unsupported_mode():
+    with pytest.raises(ValueError):
+        match_records_to_l2(_records(), _make_grid(), ["chlor_a"], 5.0, 3600, mode="bogus")
+
+
+def test_per_line_time_uses_pixel_rows():
+    l2 = _make_grid()
+    # One time per scan line, 60 s apart; the window spans lines 21-23.
+    l2.time = T0.timestamp() + 60.0 * (np.arange(l2.lat.shape[0]) - 20)
+    rec = SeaBASSRecord(
+        lat=float(l2.lat[22, 10]), lon=float(l2.lon[22, 10]), time=T0, depth=None, variables={}
+    )
+    result = match_record_to_l2(rec, l2, ["chlor_a"], max_distance_km=1.2, max_time_diff_sec=3600)
+    assert result["matchup_min_dt_sec"] == 60.0
+
+
+def test_batched_output_buffer_for_no_records():
+    out = match_records_to_l2([], _make_grid(), ["chlor_a"], 5.0, 3600)
+    assert out.shape == (0,)
+    assert "sat_chlor_a_n" in out.dtype.names
+
+
+@pytest.mark.skipif(not NUMBA_AVAILABLE, reason="needs numba")
+def test_compiled_window_selection_matches_numpy():
+    l2 = _make_grid()
+    lat, lon = record_coordinates(_records())
+    compiled = _window_indices_compiled(lat, lon, l2, 5.0)
+    for a, b in zip(compiled, _window_indices_bbox(lat, lon, l2, 5.0)):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_tree_and_scan_window_selection_agree():
+    l2 = _make_grid()
+    records = _records()
+    lat, lon = record_coordinates(records)
+    scanned = _window_indices_batch(lat, lon, l2, 5.0)
+    assert l2._tree is None
+    for rec, idx in zip(records, scanned):
+        # A single record is scanned as well, not worth building the tree
+        np.testing.assert_array_equal(idx, _subset_window_indices(rec, l2, 5.0))
+    assert l2._tree is None
+    for a, b in zip(_window_indices_tree(lat, lon, l2, 5.0), scanned):
+        np.testing.assert_array_equal(a, b)
+    assert l2._tree is not None
+    for a, b in zip(_window_indices_batch(lat, lon, l2, 5.0), scanned):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_window_stats_match_numpy_reductions():
+    l2 = _make_grid()
+    # Second variable with its own NaN pattern, stored as float64
+    kd = np.linspace(0.0, 1.0, l2.lat.size).reshape(l2.lat.shape) ** 2
+    kd[::3, ::2] = np.nan
+    l2.variables["kd"] = kd
+    records = _records()
+    batched = match_records_to_l2(records, l2, ["chlor_a", "kd"], 5.0, 3 * 3600)
+    for rec, row in zip(records, batched):
+        idx = _subset_window_indices(rec, l2, 5.0)
+        for v in ("chlor_a", "kd"):
+            vals = l2.variables[v].ravel()[idx]
+            vals = vals[np.isfinite(vals)].astype("float64")
+            assert row[f"sat_{v}_n"] == vals.size
+            if vals.size:
+                assert row[f"sat_{v}_mean"] == pytest.approx(np.mean(vals), rel=1e-12)
+                assert row[f"sat_{v}_median"] == np.median(vals)
+                assert row[f"sat_{v}_std"] == pytest.approx(np.std(vals), rel=1e-12)
+
+
+def test_nearest_pixel_is_great_circle_nearest():
+    l2 = _make_grid()
+    l2.lat[0, 0] = np.nan
+    for rec in _records():
+        idx = _subset_nearest_indices(rec, l2)
+        d = haversine_km(rec.lat, rec.lon, l2.lat.astype("float64"), l2.lon.astype("float64"))
+        assert idx.tolist() == [np.nanargmin(d)]
+
+
+def test_record_epoch_seconds():
+    records = _records()
+    records[1] = dataclasses.replace(records[1], time=None)
+    epoch = record_epoch_seconds(records)
+    assert epoch[0] == T0.timestamp()
+    assert np.isnan(epoch[1])
+
+    l2 = _make_grid()
+    batched = match_records_to_l2(
+        records, l2, ["chlor_a"], 5.0, 3600, record_epoch_sec=epoch
+    )
+    assert [_row_to_dict(row) for row in batched] == [
+        match_record_to_l2(rec, l2, ["chlor_a"], 5.0, 3600, rec_epoch_sec=t)
+        for rec, t in zip(records, epoch)
+    ]
+    # No record time: no Δt, and no time gate
+    assert np.isnan(batched[1]["matchup_min_dt_sec"])
+    assert batched[1]["sat_chlor_a_n"] > 0
+
+
+def test_record_coordinates_are_used_for_matching():
+    records = _records()
+    lat, lon = record_coordinates(records)
+    assert lat.dtype == np.float64
+    assert lat.tolist() == [r.lat for r in records]
+    assert lon.tolist() == [r.lon for r in records]
+
+    l2 = _make_grid()
+    expected = match_records_to_l2(records, l2, ["chlor_a"], 5.0, 3600)
+    batched = match_records_to_l2(
+        records, l2, ["chlor_a"], 5.0, 3600, record_lat=lat, record_lon=lon
+    )
+    assert [_row_to_dict(r) for r in batched] == [_row_to_dict(r) for r in expected]
+    # The arrays, not the record objects, give the positions
+    moved = match_records_to_l2(
+        records, l2, ["chlor_a"], 5.0, 3600, record_lat=lat[::-1], record_lon=lon[::-1]
+    )
+    assert [_row_to_dict(r) for r in moved] == [_row_to_dict(r) for r in expected[::-1]]
+
+
+@pytest.mark.parametrize("flags_dtype", [np.uint32, np.int64])
+def test_clear_bad_flags(flags_dtype):
+    l2 = _make_grid()
+    l2.flags = l2.flags.astype(flags_dtype)
+    idx = np.arange(0, l2.lat.size, 3)
+    keep = np.ones(idx.size, dtype=bool)
+    keep[::5] = False
+    expected = keep & ((l2.flags.ravel()[idx] & 2) == 0)
+    _clear_bad_flags(l2, idx, 2, keep)
+    np.testing.assert_array_equal(keep, expected)
+
+
+def test_duplicate_records_are_matched_once(monkeypatch):
+    import matchup.match_row as match_row
+
+    l2 = _make_grid()
+    base = _records()
+    records = [base[0], base[1], base[0], base[3], base[1], base[0]]
+    seen = []
+    real = match_row._match_selected_pixels
+
+    def spy(rec_lat, *args):
+        seen.append(rec_lat.size)
+        return real(rec_lat, *args)
+
+    monkeypatch.setattr(match_row, "_match_selected_pixels", spy)
+    batched = match_records_to_l2(records, l2, ["chlor_a"], 5.0, 3600)
+    assert seen == [3]
+    expected = match_records_to_l2(base, l2, ["chlor_a"], 5.0, 3600)
+    assert [_row_to_dict(r) for r in batched] == [
+        _row_to_dict(expected[k]) for k in (0, 1, 0, 3, 1, 0)
+    ]
+
+
+@pytest.mark.skipif(not NUMBA_AVAILABLE, reason="needs numba")
+def test_compiled_segment_stats_match_numpy():
+    rng = np.random.default_rng(1)
+    values = rng.normal(size=(2, 40))
+    values[0, ::3] = np.nan
+    values[1, 10:20] = np.nan
+    starts = np.array([0, 7, 10, 20, 33])
+    sizes = np.diff(np.r_[starts, values.shape[1]])
+    shape = (2, starts.size)
+    counts = np.empty(shape, dtype=np.intp)
+    mean, median, std = np.empty(shape), np.empty(shape), np.empty(shape)
+    segment_stats(values, starts, sizes, counts, mean, median, std)
+
+    expected = _segment_stats_numpy(values, starts, sizes)
+    np.testing.assert_array_equal(counts, expected[0])
+    np.testing.assert_allclose(mean, expected[1], rtol=1e-12)
+    np.testing.assert_array_equal(median, expected[2])
+    np.testing.assert_allclose(std, expected[3], rtol=1e-12)
+    assert counts[1, 2] == 0 and np.isnan(median[1, 2])
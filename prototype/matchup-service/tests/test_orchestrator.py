@@ -0,0 +1,18 @@
+import matchup.filters as filters
+from matchup._kernels import NUMBA_AVAILABLE
+from matchup.orchestrator import _init_worker
+
+
+def test_init_worker_limits_threads(monkeypatch):
+    monkeypatch.setattr(filters, "_TREE_QUERY_WORKERS", -1)
+    seen = []
+    if NUMBA_AVAILABLE:
+        import numba
+
+        monkeypatch.setattr(numba, "set_num_threads", lambda n: seen.append(n))
+
+    _init_worker(1)
+
+    assert filters._tree_query_workers() == 1
+    if NUMBA_AVAILABLE:
+        assert seen == [1]
@@ -0,0 +1,93 @@
+from datetime import datetime, timezone
+
+import numpy as np
+
+from matchup.seabass_parser import SeaBASSData, _parse_date, _parse_time, parse_seabass_file
+
+
+SB_TEXT = """/begin_header
+/fields=date,time,lat,lon,depth,chl,station
+/missing=-9999
+/delimiter=comma
+/end_header
+20240520,19:15:01,29.2,-87.7,5,1.5,A1
+20240520,191502,29.21,-87.71,-9999,NaN,B2
+! comment
+20240520,19:15:01,-9999,-87.7,5,1.5,no_lat
+20240521,xx,29.2,-87.7,5,1.5,no_time
+20240521,1915,29.3,-87.8
+"""
+
+
+def _parse(tmp_path, text=SB_TEXT):
+    path = tmp_path / "input.sb"
+    path.write_text(text)
+    return parse_seabass_file(str(path))
+
+
+def test_parse_records(tmp_path):
+    data = _parse(tmp_path)
+    assert data.header["fields"] == ["date", "time", "lat", "lon", "depth", "chl", "station"]
+    assert [(r.lat, r.lon, r.depth) for r in data.records] == [
+        (29.2, -87.7, 5.0),
+        (29.21, -87.71, None),
+        (29.3, -87.8, None),
+    ]
+    assert [r.time for r in data.records] == [
+        datetime(2024, 5, 20, 19, 15, 1, tzinfo=timezone.utc),
+        datetime(2024, 5, 20, 19, 15, 2, tzinfo=timezone.utc),
+        datetime(2024, 5, 21, 19, 15, 0, tzinfo=timezone.utc),
+    ]
+    # lat/lon/depth/date/time live on the record itself
+    assert data.records[0].variables == {"chl": 1.5, "station": "A1"}
+    assert data.records[1].variables["chl"] is None
+    # Short rows: absent cells are None
+    assert data.records[2].variables["station"] is None
+
+
+def test_columns_match_records(tmp_path):
+    data = _parse(tmp_path)
+    from_records = SeaBASSData(header=data.header, records=data.records)
+    for name in ("lat", "lon", "epoch_sec"):
+        np.testing.assert_array_equal(getattr(data, name), getattr(from_records, name))
+    assert data.epoch_sec[0] == data.records[0].time.timestamp()
+
+
+def test_repeated_strings_are_shared(tmp_path):
+    rows = "".join(f"20240520,19:15:0{k},29.2,-87.7,5,1.5,A1\n" for k in range(3))
+    data = _parse(tmp_path, SB_TEXT.split("20240520")[0] + rows)
+    stations = [r.variables["station"] for r in data.records]
+    assert stations == ["A1"] * 3
+    assert stations[0] is stations[1] is stations[2]
+
+
+def test_cell_spellings(tmp_path):
+    rows = "".join(
+        f"20240520,19:15:01,29.2,-87.7,5,{chl},A1\n"
+        for chl in ("-nan", "+NaN", "nan", "inf", "1_000", "1e3")
+    )
+    data = _parse(tmp_path, SB_TEXT.split("20240520")[0] + rows)
+    chl = [r.variables["chl"] for r in data.records]
+    # Signed NaN spellings stay strings; plain nan is missing; float()
+    # spellings (inf, digit underscores) are numbers
+    assert chl == ["-nan", "+NaN", None, float("inf"), 1000.0, 1000.0]
+
+
+def test_records_without_extra_fields(tmp_path):
+    text = "/begin_header\n/fields=date,time,lat,lon\n/end_header\n20240520,19:15:01,29.2,-87.7\n"
+    data = _parse(tmp_path, text)
+    assert [(r.lat, r.lon, r.variables) for r in data.records] == [(29.2, -87.7, {})]
+
+
+def test_parse_date_and_time_shapes():
+    assert _parse_date("20240520") == datetime(2024, 5, 20, tzinfo=timezone.utc)
+    assert _parse_date(" 2024-05-20 ") == datetime(2024, 5, 20, tzinfo=timezone.utc)
+    assert [_parse_time(s) for s in ("19:15:01", "191501", "19:15", "1915")] == [
+        (19, 15, 1), (19, 15, 1), (19, 15, 0), (19, 15, 0),
+    ]
+    # Wrong length or separators, and digits int() rejects (isdigit()
+    # accepts superscripts), are not dates/times rather than errors
+    for s in ("2024052", "2024/05/20", "2024052\u00b2", "-2024-05-2"):
+        assert _parse_date(s) is None
+    for s in ("19-15-01", "1915\u00b2", "19:1", "+1915"):
+        assert _parse_time(s) is None